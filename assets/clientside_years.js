@@ -0,0 +1,61 @@
+// Baut die Figure eines jahresbezogenen Graphen im Browser aus den Daten im
+// dcc.Store (siehe clientside_years.py), ohne Anfrage an den Server.
+(function () {
+    // Entspricht figures.formatter()
+    function formatter(value) {
+        if (value >= 1e9) {
+            return (value / 1e9).toFixed(0) + ' Mrd';
+        } else if (value >= 1e6) {
+            return (value / 1e6).toFixed(0) + ' Mio';
+        } else if (value >= 1e3) {
+            return (value / 1e3).toFixed(0) + ' K';
+        }
+        return Number.isInteger(value) ? value.toFixed(1) : String(value);
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        jahr: {
+            figure: function (year, store) {
+                if (!store || year === undefined || year === null) {
+                    return window.dash_clientside.no_update;
+                }
+                var columns = store.columns;
+                var years = columns[store.year_column];
+                var rows = [];
+                for (var i = 0; i < years.length; i++) {
+                    if (years[i] === year) {
+                        rows.push(i);
+                    }
+                }
+                var pick = function (column) {
+                    return rows.map(function (row) { return columns[column][row]; });
+                };
+
+                var x = pick(store.x_column);
+                var maxValue = 0;
+                var data = store.traces.map(function (spec) {
+                    var y = pick(spec.y_column);
+                    maxValue = Math.max.apply(null, [maxValue].concat(y));
+                    return Object.assign({}, spec.trace, {x: x, y: y});
+                });
+
+                var layout = Object.assign({}, store.layout, {
+                    title: {text: store.title.replace('{jahr}', year)}
+                });
+                if (store.ticks) {
+                    // Auf den nächsten Rundungsschritt aufrunden, dann gleichmäßige Ticks
+                    var roundedMax = Math.ceil(maxValue / store.ticks.round) * store.ticks.round;
+                    var tickvals = [];
+                    for (var value = 0; value < roundedMax + 1; value += store.ticks.step) {
+                        tickvals.push(value);
+                    }
+                    layout.yaxis = Object.assign({}, store.layout.yaxis, {
+                        tickvals: tickvals,
+                        ticktext: tickvals.map(formatter)
+                    });
+                }
+                return {data: data, layout: layout};
+            }
+        }
+    });
+})();
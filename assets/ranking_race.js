@@ -0,0 +1,107 @@
+// Bar-Race der Export- und Importrankings (siehe ranking_race.py). Die Frames
+// kommen delta-kodiert als base64-Typed-Arrays im dcc.Store; daraus wird
+// einmal eine Plotly-Figure mit allen Frames gebaut, die dann ohne weitere
+// Anfragen an den Server abgespielt wird.
+(function () {
+    var TYPES = {int16: Int16Array, uint32: Uint32Array, float32: Float32Array};
+
+    function decode(base64, type) {
+        var binary = atob(base64);
+        var bytes = new Uint8Array(binary.length);
+        for (var i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        return new TYPES[type](bytes.buffer);
+    }
+
+    // Deltas nacheinander anwenden: je Jahr Land-ID -> [Wert, Platz]
+    function replay(race) {
+        var bars = {};
+        return race.frames.map(function (frame) {
+            decode(frame.removed, 'int16').forEach(function (id) { delete bars[id]; });
+            var ids = decode(frame.ids, 'int16');
+            // Werte kommen in Tausend €
+            var values = decode(frame.values, 'uint32');
+            var ranks = decode(frame.ranks, 'float32');
+            for (var i = 0; i < ids.length; i++) {
+                bars[ids[i]] = [values[i] * 1000, ranks[i]];
+            }
+            return Object.keys(bars)
+                .map(function (id) { return [Number(id)].concat(bars[id]); })
+                .sort(function (a, b) { return a[2] - b[2]; });
+        });
+    }
+
+    function trace(store, rows, style) {
+        var names = rows.map(function (row) { return store.countries[row[0]]; });
+        return {
+            type: 'bar',
+            orientation: 'h',
+            ids: names,
+            x: rows.map(function (row) { return row[1]; }),
+            y: rows.map(function (row) { return row[2]; }),
+            text: names,
+            customdata: rows.map(function (row) { return row[2]; }),
+            textposition: 'auto',
+            marker: {color: style.color},
+            hovertemplate: '<b>%{text}</b><br>Platz %{customdata}<br>' + style.wert + ': %{x:,.0f} €<extra></extra>'
+        };
+    }
+
+    function animate(duration) {
+        return {
+            frame: {duration: duration, redraw: true},
+            transition: {duration: duration * 0.6, easing: 'cubic-in-out'},
+            mode: 'immediate',
+            fromcurrent: true
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        race: {
+            figure: function (metric, store) {
+                if (!store || !metric || !store.races[metric] || store.years.length === 0) {
+                    return window.dash_clientside.no_update;
+                }
+                var race = store.races[metric];
+                var style = store.style[metric];
+                var years = store.years.map(String);
+                var frames = replay(race).map(function (rows, i) {
+                    return {name: years[i], data: [trace(store, rows, style)],
+                            layout: {title: {text: style.title.replace('{n}', store.n) + ' ' + years[i]}}};
+                });
+                var last = frames[frames.length - 1];
+
+                return {
+                    data: last.data,
+                    frames: frames,
+                    layout: {
+                        title: last.layout.title,
+                        xaxis: {title: {text: style.wert + ' (€)'}, range: [0, race.max * 1.05]},
+                        // Platz 1 oben, feste Zeilen für die Top N
+                        yaxis: {title: {text: 'Platz'}, range: [store.n + 0.5, 0.5], dtick: 1},
+                        showlegend: false,
+                        margin: {t: 60, b: 120},
+                        updatemenus: [{
+                            type: 'buttons',
+                            direction: 'left',
+                            x: 0, y: -0.15, xanchor: 'left', yanchor: 'top',
+                            buttons: [
+                                {label: '▶', method: 'animate', args: [null, animate(900)]},
+                                {label: '❚❚', method: 'animate', args: [[null], animate(0)]}
+                            ]
+                        }],
+                        sliders: [{
+                            active: years.length - 1,
+                            x: 0.1, len: 0.9, y: -0.1, yanchor: 'top',
+                            currentvalue: {prefix: 'Jahr: '},
+                            steps: years.map(function (year) {
+                                return {label: year, method: 'animate', args: [[year], animate(300)]};
+                            })
+                        }]
+                    }
+                };
+            }
+        }
+    });
+})();
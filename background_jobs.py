@@ -0,0 +1,105 @@
+import functools
+import os
+import tempfile
+
+from dash import DiskcacheManager, html
+from dash.dependencies import Output
+
+import data_access
+import data_store
+
+# Callbacks, die wirklich Sekunden rechnen (die Detailabfragen in
+# views/detaildaten.py), laufen als Dash-Hintergrund-Callbacks in eigenen
+# Prozessen statt im Gunicorn-Worker. Nicht für Würfel- und Rollup-Abfragen:
+# die brauchen Mikrosekunden, ein Job kostet dagegen einen Prozessstart und
+# mindestens ein Abfrageintervall (1 s). Ergebnisse liegen im diskcache und
+# werden für gleiche Eingaben und gleiche Datenversion sitzungsübergreifend
+# wiederverwendet. Ohne diskcache (pip install "dash[diskcache]") oder mit
+# BACKGROUND_CALLBACKS=0 laufen sie direkt.
+# Einen Abbruch beim Seitenwechsel gibt es nicht: die Navigation lädt die
+# Seite neu (routes.py), url.pathname ändert sich innerhalb einer Seite nie.
+# Ein Job, dessen Seite verlassen wurde, läuft deshalb bis zum Ende; sein
+# Ergebnis landet im Cache und bedient die nächste gleiche Anfrage.
+
+ENABLED = os.environ.get('BACKGROUND_CALLBACKS', '1') == '1'
+CACHE_DIR = os.environ.get('BACKGROUND_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'dash-background'))
+# Sekunden ohne Zugriff, nach denen ein Ergebnis aus dem Cache fällt
+EXPIRE = int(os.environ.get('BACKGROUND_CACHE_EXPIRE', 24 * 3600))
+
+VISIBLE = {'width': '50%', 'visibility': 'visible'}
+HIDDEN = {'width': '50%', 'visibility': 'hidden'}
+
+_manager = None
+# Job-ID für Ergebnisse aus dem Cache: kein Prozess, psutil kennt keine
+# negativen PIDs, job_running() ist also False und terminate_job() tut nichts
+CACHED_JOB = -1
+# Baut den abgeleiteten Zustand, den die Jobs lesen (z. B. views.common.time_rollup)
+_warmers = []
+
+
+# Teil des Cache-Schlüssels: neue Daten ergeben neue Ergebnisse
+def data_version():
+    return data_store.data_version(list(data_store.TABLES)) + data_access.backend().version()
+
+
+class JobManager(DiskcacheManager):
+
+    def call_job_fn(self, key, job_fn, args, context):
+        # Dash startet sonst für jede Anfrage einen Job, auch wenn das
+        # Ergebnis für dieselben Eingaben und Daten schon im Cache liegt; die
+        # erste Abfrage des Browsers holt es dann direkt ab
+        if self.result_ready(key):
+            return CACHED_JOB
+        # Läuft im Worker direkt vor dem fork: Tabellen und abgeleitete
+        # Indizes hier bauen, damit der Job sie erbt, statt sie selbst zu
+        # laden und danach wegzuwerfen
+        for warm in _warmers:
+            warm()
+        return super().call_job_fn(key, job_fn, args, context)
+
+
+def manager():
+    global _manager
+    if _manager is None:
+        _manager = False
+        if ENABLED:
+            try:
+                import diskcache
+                _manager = JobManager(diskcache.Cache(CACHE_DIR), cache_by=[data_version], expire=EXPIRE)
+            except ImportError:
+                pass
+    return _manager or None
+
+
+def progress_bar(progress_id):
+    return html.Progress(id=progress_id, value='0', max='1', style=HIDDEN)
+
+
+def _no_progress(progress):
+    pass
+
+
+def callback(app, outputs, inputs, progress_id, warm=()):
+    # Für rechenintensive Callbacks statt app.callback; func bekommt als
+    # erstes Argument set_progress((schritt, schritte)). warm: Funktionen
+    # ohne Argumente, die den abgeleiteten Zustand für func bauen.
+    def decorator(func):
+        _warmers.extend(w for w in warm if w not in _warmers)
+        if manager() is None:
+            @functools.wraps(func)
+            def inline(*args):
+                return func(_no_progress, *args)
+            return app.callback(outputs, inputs)(inline)
+        return app.callback(
+            outputs, inputs,
+            background=True,
+            manager=manager(),
+            progress=[Output(progress_id, 'value'), Output(progress_id, 'max')],
+            running=[(Output(progress_id, 'style'), VISIBLE, HIDDEN)],
+        )(func)
+    return decorator
+
+
+def report(set_progress, step, steps):
+    set_progress((str(step), str(steps)))
+
@@ -0,0 +1,118 @@
+import base64
+import math
+import os
+import sys
+import timeit
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_store  # noqa: E402
+import figures  # noqa: E402
+from views import monatlicher_verlauf, top_handelspartner  # noqa: E402
+
+# Vergleicht den dict-basierten Figure-Aufbau (figures.py) mit dem
+# bisherigen Weg über go.Figure(), jeweils inklusive Serialisierung.
+
+YEAR = 2024
+
+
+def monthly_go(year_selected):
+    df = data_store.get_table('gesamt_deutschland_monthly')
+    df_year_monthly = df[df['Jahr'] == year_selected]
+    fig = go.Figure()
+    for col, name, color in zip(
+        ['export_wert', 'import_wert', 'handelsvolumen_wert'],
+        ['Exportvolumen', 'Importvolumen', 'Gesamthandelsvolumen'],
+        ['#1f77b4', '#ff7f0e', '#2ca02c']
+    ):
+        fig.add_trace(go.Scatter(
+            x=df_year_monthly['Monat'],
+            y=df_year_monthly[col],
+            mode='lines+markers',
+            name=name,
+            line=dict(width=2, color=color),
+            hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
+        ))
+    max_value = df_year_monthly[['export_wert', 'import_wert', 'handelsvolumen_wert']].values.max()
+    rounded_max = math.ceil(max_value / 50e9) * 50e9
+    tickvals = np.arange(0, rounded_max + 1, 25e9)
+    fig.update_layout(
+        title=f'Monatlicher Export-, Import- und Handelsverlauf Deutschlands im Jahr {year_selected}',
+        xaxis_title='Monat',
+        yaxis_title='Wert in €',
+        xaxis=dict(
+            tickmode='array',
+            tickvals=list(range(1, 13)),
+            ticktext=['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
+        ),
+        yaxis=dict(tickvals=tickvals, ticktext=[figures.formatter(val) for val in tickvals]),
+        legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
+    )
+    return fig
+
+
+def top_10_go(year_selected):
+    df_grouped = data_store.get_table('df_grouped')
+    result = []
+    for col, ranking, name, color, title in [
+        ('export_wert', 'export_ranking', 'Export', '#1f77b4', 'Top 10 Exportländer Deutschlands'),
+        ('import_wert', 'import_ranking', 'Import', '#ff7f0e', 'Top 10 Importländer Deutschlands'),
+        ('handelsvolumen_wert', 'handelsvolumen_ranking', 'Handelsvolumen', '#2ca02c',
+         'Top 10 Handelspartner nach Handelsvolumen'),
+    ]:
+        top = df_grouped[(df_grouped[ranking] <= 10) & (df_grouped['Jahr'] == year_selected)].sort_values(ranking)
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=top['Land'], y=top[col], marker=dict(color=color), name=name))
+        fig.update_layout(title=title, yaxis_title='Wert in €')
+        result.append(fig)
+    return result
+
+
+def _plain(value):
+    # numpy-Arrays, base64-kodierte Arrays und Listen gleich behandeln,
+    # um nur den Inhalt zu vergleichen
+    if isinstance(value, dict) and 'bdata' in value:
+        return _plain(np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype']))
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def same_figure(fig_dict, fig_go):
+    return _plain(go.Figure(fig_dict).to_dict()) == _plain(fig_go.to_dict())
+
+
+def bench(label, func, number=200):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f'{label:<48}{seconds * 1e3:>10.3f} ms')
+    return seconds
+
+
+def main():
+    monthly_dict = lambda: to_json_plotly(monatlicher_verlauf.update_monthly_graph.uncached('/monatlicher-handelsverlauf', YEAR))
+    top_10_dict = lambda: to_json_plotly(top_handelspartner.update_top_10_graphs.uncached('/top-10-handelspartner', YEAR))
+
+    # Beide Wege müssen dieselbe Figure ergeben
+    assert same_figure(monatlicher_verlauf.update_monthly_graph.uncached('/monatlicher-handelsverlauf', YEAR), monthly_go(YEAR))
+    for fig_dict, fig_go in zip(top_handelspartner.update_top_10_graphs.uncached('/top-10-handelspartner', YEAR), top_10_go(YEAR)):
+        assert same_figure(fig_dict, fig_go)
+
+    for label, fast, slow in [
+        ('Monatlicher Handelsverlauf', monthly_dict, lambda: to_json_plotly(monthly_go(YEAR))),
+        ('Top 10 Handelspartner (3 Graphen)', top_10_dict, lambda: to_json_plotly(top_10_go(YEAR))),
+    ]:
+        t_fast = bench(f'{label} / dict', fast)
+        t_slow = bench(f'{label} / go.Figure', slow)
+        print(f'{"":<48}{t_slow / t_fast:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Ohne Figure-Cache messen, sonst wird ab der zweiten Wiederholung nur der
+# Cache gemessen; ohne Watcher-Thread, damit nichts im Hintergrund lädt
+os.environ['FIGURE_CACHE_SIZE'] = '0'
+os.environ['DATA_WATCH_INTERVAL'] = '0'
+# Den monatlichen Verlauf über den Server-Callback messen statt im Browser
+os.environ.setdefault('CLIENTSIDE_YEARS', '0')
+
+import pandas as pd  # noqa: E402
+
+import data_store  # noqa: E402
+
+# Benchmark-Suite ohne Browser: Importzeit von sidebar.py, Ladezeit jeder
+# Tabelle und p50/p99-Latenz der Callbacks für jede Route und jedes Jahr,
+# jeweils über /_dash-update-component inklusive Serialisierung, sowie die
+# Größe der Antwort. Ergebnisse als JSON; mit --compare werden sie gegen eine
+# Baseline geprüft.
+#
+#   python benchmarks/bench_suite.py --save benchmarks/baseline.json
+#   python benchmarks/bench_suite.py --compare benchmarks/baseline.json --threshold 15
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+# Callbacks mit (pathname, jahr) und ihren Routen
+YEAR_CALLBACKS = {
+    'update_monthly_graph': (['monatlich_graph.figure'], ['/monatlicher-handelsverlauf']),
+    'update_top_10_graphs': (['export_graph.figure', 'import_graph.figure', 'handelsvolumen_graph.figure'],
+                             ['/top-10-handelspartner']),
+    'update_growth_graphs': (['zuwachs_export_graph.figure', 'zuwachs_import_graph.figure'],
+                             ['/laender-zuwaechse-absolut', '/laender-zuwaechse-relativ']),
+    'update_top_10_waren': (['waren_export_graph.figure', 'waren_import_graph.figure'],
+                            ['/top-10-waren']),
+}
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def summarize(samples, nbytes=None):
+    result = {
+        'p50_ms': round(percentile(samples, 50) * 1e3, 3),
+        'p99_ms': round(percentile(samples, 99) * 1e3, 3),
+        'runs': len(samples),
+    }
+    if nbytes is not None:
+        result['bytes'] = nbytes
+    return result
+
+
+def bench_startup(repeat):
+    # Frischer Prozess je Messung, damit Importe und Laden nicht gecacht sind
+    results = {}
+    for mode in ('lazy', 'eager'):
+        env = dict(os.environ, DATA_LOADING=mode, FIGURE_CACHE_WARM='0')
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', 'import sidebar'], cwd=ROOT, env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            samples.append(time.perf_counter() - start)
+        results[f'startup:{mode}'] = summarize(samples)
+    return results
+
+
+def bench_loading(repeat):
+    results = {}
+    for name in data_store.TABLES:
+        if data_store.is_stale(name):
+            data_store.convert_table(name)
+        for source, load in [('csv', data_store.read_csv),
+                             ('store', lambda n: pd.read_feather(data_store.store_path(n))),
+                             ('mmap', data_store.read_mapped)]:
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                load(name)
+                samples.append(time.perf_counter() - start)
+            results[f'load:{name}:{source}'] = summarize(samples)
+    return results
+
+
+def request_body(outputs, inputs):
+    specs = [{'id': output.split('.')[0], 'property': output.split('.')[1]} for output in outputs]
+    return {
+        'output': outputs[0] if len(outputs) == 1 else '..' + '...'.join(outputs) + '..',
+        'outputs': specs[0] if len(specs) == 1 else specs,
+        'inputs': inputs,
+        'changedPropIds': [f"{inputs[0]['id']}.{inputs[0]['property']}"],
+    }
+
+
+def timed_post(client, pathname, body, repeat, before=None):
+    # Referer wie im Browser: daran erkennt routes.py die Seite, deren
+    # Callbacks geladen sein müssen. before() läuft vor jeder Anfrage,
+    # außerhalb der gemessenen Zeit.
+    headers = {'Referer': f'http://localhost{pathname}'}
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        response = client.post('/_dash-update-component', json=body, headers=headers)
+        samples.append(time.perf_counter() - start)
+        if response.status_code not in (200, 204):
+            raise RuntimeError(f"{body['output']}: HTTP {response.status_code}")
+    return samples, len(response.get_data())
+
+
+def bench_callbacks(repeat, years=None):
+    import routes
+    import sidebar
+    client = sidebar.server.test_client()
+    years = years or sorted(int(j) for j in data_store.get_table('gesamt_deutschland_monthly')['Jahr'].unique())
+
+    results = {}
+    for pathname in routes.routes():
+        body = request_body(['content.children'], [{'id': 'url', 'property': 'pathname', 'value': pathname}])
+        # Layout-Cache leeren, sonst misst p50 ab der zweiten Anfrage nur den Lookup
+        samples, nbytes = timed_post(client, pathname, body, repeat, before=routes.clear_layouts)
+        results[f'callback:display_content:{pathname}'] = summarize(samples, nbytes)
+
+    for callback, (outputs, pathnames) in YEAR_CALLBACKS.items():
+        for pathname in pathnames:
+            for year in years:
+                body = request_body(outputs, [
+                    {'id': 'url', 'property': 'pathname', 'value': pathname},
+                    {'id': 'jahr_dropdown', 'property': 'value', 'value': year},
+                ])
+                samples, nbytes = timed_post(client, pathname, body, repeat)
+                results[f'callback:{callback}:{pathname}:{year}'] = summarize(samples, nbytes)
+    return results
+
+
+def compare(current, baseline, threshold, metrics, min_ms):
+    # Regression: Wert liegt mehr als threshold Prozent über der Baseline;
+    # bei Zeiten zusätzlich mindestens min_ms, damit Rauschen im
+    # Sub-Millisekundenbereich nicht anschlägt
+    regressions, improvements = [], []
+    for name, values in sorted(current.items()):
+        old = baseline.get(name)
+        if old is None:
+            continue
+        for metric in metrics:
+            if metric not in values or metric not in old or not old[metric]:
+                continue
+            change = (values[metric] - old[metric]) / old[metric] * 100
+            delta = values[metric] - old[metric]
+            if metric.endswith('_ms') and abs(delta) < min_ms:
+                continue
+            line = f'{name} {metric}: {old[metric]} -> {values[metric]} ({change:+.1f} %)'
+            if change > threshold:
+                regressions.append(line)
+            elif change < -threshold:
+                improvements.append(line)
+    # Nur Gruppen melden, die in diesem Lauf gemessen wurden (siehe --skip)
+    measured = {name.split(':')[0] for name in current}
+    missing = sorted(name for name in set(baseline) - set(current) if name.split(':')[0] in measured)
+    return regressions, improvements, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Start-, Lade- und Callback-Benchmarks für sidebar.py')
+    parser.add_argument('--repeat', type=int, default=20, help='Wiederholungen je Callback, Route und Jahr')
+    parser.add_argument('--startup-repeat', type=int, default=3)
+    parser.add_argument('--years', type=int, nargs='*', help='Nur diese Jahre messen')
+    parser.add_argument('--skip', nargs='*', default=[], choices=['startup', 'loading', 'callbacks'])
+    parser.add_argument('--save', metavar='PATH', help='Ergebnisse als JSON-Baseline speichern')
+    parser.add_argument('--compare', metavar='PATH', nargs='?', const=DEFAULT_BASELINE,
+                        help='Mit einer Baseline vergleichen (Standard: benchmarks/baseline.json)')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Regression ab dieser Verschlechterung in Prozent')
+    parser.add_argument('--metrics', default='p50_ms,bytes', help='Verglichene Kennzahlen, kommagetrennt')
+    parser.add_argument('--min-ms', type=float, default=0.5, help='Kleinere Zeitdifferenzen ignorieren')
+    args = parser.parse_args()
+
+    results = {}
+    if 'startup' not in args.skip:
+        results.update(bench_startup(args.startup_repeat))
+    if 'loading' not in args.skip:
+        results.update(bench_loading(args.repeat))
+    if 'callbacks' not in args.skip:
+        results.update(bench_callbacks(args.repeat, args.years))
+
+    for name, values in results.items():
+        size = f"{values['bytes']:>10}" if 'bytes' in values else ''
+        print(f"{name:<75}{values['p50_ms']:>10.2f}{values['p99_ms']:>10.2f}{size}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'meta': {
+                    'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'repeat': args.repeat,
+                },
+                'results': results,
+            }, f, indent=1, sort_keys=True)
+        print(f'Baseline gespeichert: {args.save}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions, improvements, missing = compare(
+            results, baseline, args.threshold, args.metrics.split(','), args.min_ms)
+        for line in improvements:
+            print(f'Verbesserung: {line}')
+        for name in missing:
+            print(f'Nicht gemessen: {name}')
+        for line in regressions:
+            print(f'REGRESSION: {line}')
+        print(f'{len(regressions)} Regressionen über {args.threshold:.0f} % gegenüber {args.compare}')
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Startet sidebar:server unter gunicorn mit N Workern, einmal mit privaten
+# DataFrames und einmal mit gemappten Tabellen (DATA_MMAP=1), und liest
+# RSS und PSS jedes Workers aus /proc. PSS teilt gemeinsam genutzte Seiten
+# auf die Prozesse auf und zeigt daher den tatsächlichen Anteil je Worker.
+
+
+def smaps_rollup(pid):
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return values
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def wait_for(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} nicht erreichbar')
+
+
+def measure(workers, port, mmap):
+    env = dict(os.environ, DATA_LOADING='eager', DATA_MMAP='1' if mmap else '0', DATA_WATCH_INTERVAL='0')
+    master = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}', 'sidebar:server'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(f'http://127.0.0.1:{port}/')
+        deadline = time.time() + 30
+        while len(children(master.pid)) < workers and time.time() < deadline:
+            time.sleep(0.2)
+        time.sleep(1)  # Worker fertig importieren lassen
+        return [smaps_rollup(pid) for pid in children(master.pid)]
+    finally:
+        master.terminate()
+        master.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSS/PSS je gunicorn-Worker mit und ohne Memory-Map')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'Modus':<10}{'Worker':>8}{'RSS MiB':>10}{'PSS MiB':>10}{'Shared MiB':>12}{'PSS gesamt':>12}")
+    for mmap in (False, True):
+        stats = measure(args.workers, args.port, mmap)
+        rss = sum(s['Rss'] for s in stats) / len(stats) / 1024
+        pss = sum(s['Pss'] for s in stats) / len(stats) / 1024
+        shared = sum(s['Shared_Clean'] + s['Shared_Dirty'] for s in stats) / len(stats) / 1024
+        total = sum(s['Pss'] for s in stats) / 1024
+        print(f"{'mmap' if mmap else 'privat':<10}{len(stats):>8}{rss:>10.1f}{pss:>10.1f}{shared:>12.1f}{total:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
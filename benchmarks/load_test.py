@@ -0,0 +1,176 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from bench_worker_memory import ROOT, wait_for
+
+# Lasttest gegen /_dash-update-component. Jeder virtuelle Nutzer spielt
+# Sitzungen ab wie im Browser: Route über url.pathname öffnen (Seiteninhalt
+# und Graphen), danach mehrmals die Jahresauswahl wechseln. Die Zahl der
+# gleichzeitigen Nutzer wird stufenweise erhöht; je Stufe werden Durchsatz,
+# Latenz-Perzentile und Fehlerquote ausgegeben. Ohne --url wird die App für
+# jede Kombination aus --workers und --threads unter gunicorn gestartet.
+#
+#   python benchmarks/load_test.py --workers 1 2 4 --threads 1 4 --users 1 4 16 32
+
+# Route -> Ausgaben des Graph-Callbacks mit url.pathname und jahr_dropdown
+SESSION_ROUTES = {
+    '/top-10-handelspartner': ['export_graph.figure', 'import_graph.figure', 'handelsvolumen_graph.figure'],
+    '/laender-zuwaechse-absolut': ['zuwachs_export_graph.figure', 'zuwachs_import_graph.figure'],
+    '/laender-zuwaechse-relativ': ['zuwachs_export_graph.figure', 'zuwachs_import_graph.figure'],
+    '/top-10-waren': ['waren_export_graph.figure', 'waren_import_graph.figure'],
+}
+
+
+def callback_body(outputs, inputs, changed):
+    specs = [{'id': output.split('.')[0], 'property': output.split('.')[1]} for output in outputs]
+    return json.dumps({
+        'output': outputs[0] if len(outputs) == 1 else '..' + '...'.join(outputs) + '..',
+        'outputs': specs[0] if len(specs) == 1 else specs,
+        'inputs': inputs,
+        'changedPropIds': changed,
+    }).encode()
+
+
+def session_requests(rng, years, flips):
+    # Nutzlasten einer Sitzung in der Reihenfolge, in der der Browser sie schickt
+    pathname = rng.choice(list(SESSION_ROUTES))
+    outputs = SESSION_ROUTES[pathname]
+    url = {'id': 'url', 'property': 'pathname', 'value': pathname}
+    year = years[-1]
+    yield pathname, callback_body(['content.children'], [url], ['url.pathname'])
+    yield pathname, callback_body(outputs, [url, {'id': 'jahr_dropdown', 'property': 'value', 'value': year}],
+                                  ['url.pathname'])
+    for _ in range(flips):
+        year = rng.choice(years)
+        yield pathname, callback_body(outputs, [url, {'id': 'jahr_dropdown', 'property': 'value', 'value': year}],
+                                      ['jahr_dropdown.value'])
+
+
+def virtual_user(host, port, years, flips, think, stop_at, samples, seed):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    while time.perf_counter() < stop_at:
+        for pathname, body in session_requests(rng, years, flips):
+            if time.perf_counter() >= stop_at:
+                break
+            start = time.perf_counter()
+            try:
+                conn.request('POST', '/_dash-update-component', body,
+                             {'Content-Type': 'application/json', 'Referer': f'http://{host}:{port}{pathname}'})
+                response = conn.getresponse()
+                response.read()
+                ok = response.status in (200, 204)
+            except (OSError, http.client.HTTPException):
+                ok = False
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+            samples.append((time.perf_counter() - start, ok))
+            if think:
+                time.sleep(rng.uniform(0, 2 * think))
+    conn.close()
+
+
+def percentile(values, q):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def run_step(host, port, users, duration, years, flips, think):
+    samples = []
+    stop_at = time.perf_counter() + duration
+    threads = [threading.Thread(target=virtual_user, args=(host, port, years, flips, think, stop_at, samples, seed))
+               for seed in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = [seconds for seconds, ok in samples if ok]
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        'users': users,
+        'requests': len(samples),
+        'throughput': len(samples) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1e3,
+        'p95_ms': percentile(latencies, 95) * 1e3,
+        'p99_ms': percentile(latencies, 99) * 1e3,
+        'error_rate': errors / len(samples) if samples else 0.0,
+    }
+
+
+def start_app(workers, threads, port):
+    env = dict(os.environ, DATA_WATCH_INTERVAL='0')
+    command = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}']
+    if threads > 1:
+        command += ['-k', 'gthread', '--threads', str(threads)]
+    server = subprocess.Popen(command + ['sidebar:server'], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for(f'http://127.0.0.1:{port}/')
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lasttest mit abgespielten Dash-Sitzungen')
+    parser.add_argument('--url', help='Laufende App, z. B. http://127.0.0.1:8050 (sonst gunicorn starten)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1])
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 2, 4, 8, 16], help='Stufen gleichzeitiger Nutzer')
+    parser.add_argument('--duration', type=float, default=10.0, help='Sekunden je Stufe')
+    parser.add_argument('--flips', type=int, default=5, help='Jahreswechsel je Sitzung')
+    parser.add_argument('--think', type=float, default=0.0, help='Mittlere Denkzeit zwischen Anfragen in Sekunden')
+    parser.add_argument('--warmup', type=float, default=3.0, help='Sekunden mit einem Nutzer vor der ersten Stufe')
+    parser.add_argument('--json', metavar='PATH', help='Ergebnisse aller Konfigurationen als JSON speichern')
+    args = parser.parse_args()
+
+    monthly = pd.read_csv(os.path.join(ROOT, 'data', 'gesamt_deutschland_monthly.csv'), usecols=['Jahr'])
+    years = sorted(int(j) for j in monthly['Jahr'].unique())
+
+    if args.url:
+        target = args.url.split('//')[-1].rstrip('/')
+        host, _, port = target.partition(':')
+        configs = [(None, None, host, int(port or 80))]
+    else:
+        configs = [(w, t, '127.0.0.1', args.port) for w in args.workers for t in args.threads]
+
+    results = []
+    print(f"{'Worker':>7}{'Threads':>8}{'Nutzer':>8}{'Anfragen':>10}{'Anfr./s':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Fehler':>9}")
+    for workers, threads, host, port in configs:
+        server = start_app(workers, threads, port) if workers else None
+        try:
+            if args.warmup:
+                run_step(host, port, 1, args.warmup, years, args.flips, 0)
+            for users in args.users:
+                step = run_step(host, port, users, args.duration, years, args.flips, args.think)
+                step.update(workers=workers, threads=threads)
+                results.append(step)
+                print(f"{workers or '-':>7}{threads or '-':>8}{users:>8}{step['requests']:>10}"
+                      f"{step['throughput']:>10.1f}{step['p50_ms']:>9.1f}{step['p95_ms']:>9.1f}"
+                      f"{step['p99_ms']:>9.1f}{step['error_rate']:>9.1%}")
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'duration': args.duration, 'flips': args.flips, 'think': args.think, 'results': results},
+                      f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
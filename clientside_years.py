@@ -0,0 +1,34 @@
+from dash import ClientsideFunction, dcc
+from dash.dependencies import Input, Output
+
+import figures
+
+# Jahresbezogene Graphen, deren Daten einmal als dcc.Store an den Browser
+# gehen. Der Jahreswechsel läuft dann komplett clientseitig
+# (assets/clientside_years.js), ohne Callback auf dem Server.
+
+
+def store_data(df, x_column, traces, title, year_column='Jahr', ticks=None, **layout):
+    # traces: Liste von (Spalte, Trace-Dict ohne x/y); title enthält {jahr}
+    columns = [year_column, x_column] + [col for col, _ in traces]
+    return {
+        'year_column': year_column,
+        'x_column': x_column,
+        'columns': {col: df[col].tolist() for col in columns},
+        'traces': [{'y_column': col, 'trace': trace} for col, trace in traces],
+        'layout': figures.figure([], **layout)['layout'],
+        'title': title,
+        'ticks': ticks,
+    }
+
+
+def store(store_id, data):
+    return dcc.Store(id=store_id, data=data)
+
+
+def register(app, graph_id, store_id, dropdown_id='jahr_dropdown'):
+    app.clientside_callback(
+        ClientsideFunction(namespace='jahr', function_name='figure'),
+        Output(graph_id, 'figure'),
+        [Input(dropdown_id, 'value'), Input(store_id, 'data')]
+    )
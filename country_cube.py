@@ -0,0 +1,37 @@
+import numpy as np
+
+import top_n
+
+
+class CountryCube:
+    # df_grouped als dichtes Array Land × Jahr × Kennzahl. Fehlende
+    # Kombinationen sind NaN; Abfragen für ein oder mehrere Länder sind
+    # reine Index-Zugriffe ohne Filtern des Long-Formats.
+
+    def __init__(self, df, metrics=top_n.METRICS):
+        self.countries = np.array(sorted(df['Land'].unique()), dtype=object)
+        self.years = np.unique(df['Jahr'].to_numpy())
+        self.metrics = list(metrics)
+        self.country_index = {land: i for i, land in enumerate(self.countries)}
+        self.year_index = {int(jahr): i for i, jahr in enumerate(self.years)}
+        self.metric_index = {metric: i for i, metric in enumerate(self.metrics)}
+
+        rows = np.searchsorted(self.countries, df['Land'].to_numpy(dtype=object))
+        cols = np.searchsorted(self.years, df['Jahr'].to_numpy())
+        self.values = np.full((len(self.countries), len(self.years), len(self.metrics)), np.nan)
+        self.values[rows, cols, :] = df[self.metrics].to_numpy(dtype='float64')
+
+    def country_rows(self, countries):
+        return [self.country_index[land] for land in countries if land in self.country_index]
+
+    def series(self, country, metric):
+        # Verlauf einer Kennzahl über alle Jahre für ein Land
+        return self.values[self.country_index[country], :, self.metric_index[metric]]
+
+    def compare(self, countries, metric):
+        # Land × Jahr für mehrere Länder und eine Kennzahl
+        return self.values[self.country_rows(countries), :, self.metric_index[metric]]
+
+    def profile(self, country, metrics):
+        # Jahr × Kennzahl für ein Land
+        return self.values[self.country_index[country], :, [self.metric_index[m] for m in metrics]].T
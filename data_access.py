@@ -0,0 +1,179 @@
+import contextlib
+import functools
+import os
+import queue
+import sqlite3
+import threading
+
+import numpy as np
+
+import data_store
+import rollups
+import top_n
+import sql_store
+
+# Datenzugriff hinter den Callbacks. Standard sind die Tabellen im Speicher
+# (PandasBackend); mit DATA_BACKEND=sqlite beantwortet eine eingebettete
+# SQLite-Datenbank die Abfragen, inklusive Filter und Top-N. Nur sie kennt
+# die Detailtabelle Land × Ware × Monat.
+
+BACKEND = os.environ.get('DATA_BACKEND', 'pandas')
+SQLITE_PATH = os.environ.get('DATA_SQLITE', sql_store.DB_PATH)
+POOL_SIZE = int(os.environ.get('DATA_SQLITE_POOL', 4))
+
+# Wertspalten je Kennzahl, für die Detailtabelle und aggregated_df
+_DETAIL_COLUMNS = {'Ausfuhr: Wert': 'ausfuhr', 'Einfuhr: Wert': 'einfuhr'}
+
+
+class DetailUnavailable(Exception):
+    pass
+
+
+class PandasBackend:
+
+    def top_countries(self, year, order_by, value, n, ascending=False):
+        index = data_store.get_derived('top_n', 'df_grouped', top_n.TopNIndex)
+        top = index.query(year, order_by, n, ascending, columns=['Land', value])
+        return top['Land'].to_numpy(dtype=object), top[value].to_numpy()
+
+    def top_goods(self, year, measure, n):
+        rollup = data_store.get_derived('time_rollup', 'aggregated_df', rollups.TimeRollup)
+        _, labels, values = rollup.top(year, measure, n)
+        return labels, values
+
+    def has_detail(self):
+        return False
+
+    def version(self):
+        # Die Tabellen im Speicher sind schon über data_store versioniert
+        return ()
+
+    def country_top_goods(self, land, measure, n, year=None):
+        raise DetailUnavailable('Detaildaten Land × Ware gibt es nur im SQL-Backend')
+
+    def goods_top_countries(self, code, measure, n, year=None):
+        raise DetailUnavailable('Detaildaten Land × Ware gibt es nur im SQL-Backend')
+
+    def country_months(self):
+        raise DetailUnavailable('Monatswerte je Land gibt es nur im SQL-Backend')
+
+
+class ConnectionPool:
+    # Feste Zahl schreibgeschützter Verbindungen je Worker-Prozess
+
+    def __init__(self, path, size):
+        self._connections = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False, cached_statements=64)
+            self._connections.put(conn)
+
+    @contextlib.contextmanager
+    def connection(self):
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+
+# Vorbereitete Abfragen je Seite. Spaltennamen lassen sich nicht als
+# Parameter übergeben, daher nur Abfragen über bekannte Kennzahlen. Reihenfolge
+# und Gleichstände wie in top_n.TopNIndex: NaN und ±inf fallen weg, bei
+# gleichem Wert entscheidet der Ländername.
+@functools.lru_cache(maxsize=None)
+def _top_countries_sql(order_by, value, ascending):
+    if order_by not in top_n.METRICS or value not in top_n.METRICS:
+        raise ValueError(f'Unbekannte Kennzahl: {order_by!r} / {value!r}')
+    direction = 'ASC' if ascending else 'DESC'
+    return (f'SELECT Land, "{value}" FROM df_grouped WHERE Jahr = ? AND "{order_by}" IS NOT NULL '
+            f'AND abs("{order_by}") != 9e999 ORDER BY "{order_by}" {direction}, Land {direction} LIMIT ?')
+
+
+_TOP_GOODS_SQL = {
+    measure: (f'SELECT Label, SUM("{measure}") AS wert FROM aggregated_df WHERE Jahr = ? '
+              f'GROUP BY Code ORDER BY wert DESC, Code DESC LIMIT ?')
+    for measure in rollups.MEASURES
+}
+# Detailabfragen über alle Jahre (jahr = NULL) oder ein einzelnes Jahr
+_COUNTRY_TOP_GOODS_SQL = {
+    measure: (f'SELECT w.Label, SUM(d.{col}) AS wert FROM handel_detail d JOIN waren w ON w.Code = d.code '
+              f'WHERE d.land = :key AND (:jahr IS NULL OR d.jahr = :jahr) '
+              f'GROUP BY d.code ORDER BY wert DESC, d.code LIMIT :n')
+    for measure, col in _DETAIL_COLUMNS.items()
+}
+_GOODS_TOP_COUNTRIES_SQL = {
+    measure: (f'SELECT land, SUM({col}) AS wert FROM handel_detail '
+              f'WHERE code = :key AND (:jahr IS NULL OR jahr = :jahr) '
+              f'GROUP BY land ORDER BY wert DESC, land LIMIT :n')
+    for measure, col in _DETAIL_COLUMNS.items()
+}
+
+# Monatswerte je Land über alle Waren (Heatmap Land × Monat)
+_COUNTRY_MONTHS_SQL = ('SELECT land, jahr, monat, SUM(ausfuhr), SUM(einfuhr) FROM handel_detail '
+                       'GROUP BY land, jahr, monat')
+
+
+class SqliteBackend:
+
+    def __init__(self, path=SQLITE_PATH, pool_size=POOL_SIZE):
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            self._detail = conn.execute('SELECT EXISTS (SELECT 1 FROM handel_detail)').fetchone()[0] == 1
+
+    def _query(self, sql, params):
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        names = np.array([row[0] for row in rows], dtype=object)
+        return names, np.array([row[1] for row in rows])
+
+    def top_countries(self, year, order_by, value, n, ascending=False):
+        return self._query(_top_countries_sql(order_by, value, ascending), (int(year), n))
+
+    def top_goods(self, year, measure, n):
+        return self._query(_TOP_GOODS_SQL[measure], (int(year), n))
+
+    def has_detail(self):
+        return self._detail
+
+    def version(self):
+        return (os.stat(self.path).st_mtime_ns,)
+
+    def _detail_query(self, sql, key, year, n):
+        if not self._detail:
+            raise DetailUnavailable(f'{self.path} enthält keine Detaildaten')
+        return self._query(sql, {'key': key, 'jahr': None if year is None else int(year), 'n': n})
+
+    def country_top_goods(self, land, measure, n, year=None):
+        return self._detail_query(_COUNTRY_TOP_GOODS_SQL[measure], land, year, n)
+
+    def goods_top_countries(self, code, measure, n, year=None):
+        return self._detail_query(_GOODS_TOP_COUNTRIES_SQL[measure], code, year, n)
+
+    def country_months(self):
+        # Zeilen (Land, Jahr, Monat, Ausfuhr, Einfuhr)
+        if not self._detail:
+            raise DetailUnavailable(f'{self.path} enthält keine Detaildaten')
+        with self.pool.connection() as conn:
+            return conn.execute(_COUNTRY_MONTHS_SQL).fetchall()
+
+
+_backend = None
+_backend_pid = None
+_lock = threading.Lock()
+
+
+def backend():
+    # Je Worker-Prozess ein Backend; nach einem fork wird der Pool neu angelegt
+    global _backend, _backend_pid
+    if _backend is None or _backend_pid != os.getpid():
+        with _lock:
+            if _backend is None or _backend_pid != os.getpid():
+                if BACKEND == 'sqlite':
+                    _backend = SqliteBackend()
+                elif BACKEND == 'pandas':
+                    _backend = PandasBackend()
+                else:
+                    raise ValueError(f"Unbekanntes Backend: {BACKEND!r} (erwartet 'pandas' oder 'sqlite')")
+                _backend_pid = os.getpid()
+    return _backend
@@ -0,0 +1,321 @@
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+STORE_DIR = os.path.join(DATA_DIR, 'store')
+
+# Rankings enthalten geteilte Plätze (z. B. 131.5) und NaN für 2008,
+# deshalb float32 statt Ganzzahl.
+_RANKING = 'float32'
+
+# Tabellenname -> (CSV-Datei, Schema)
+TABLES = {
+    'gesamt_deutschland': ('1gesamt_deutschland.csv', {
+        'Jahr': 'int16',
+        'gesamt_export': 'int64',
+        'gesamt_import': 'int64',
+        'gesamt_handelsvolumen': 'int64',
+    }),
+    'gesamt_deutschland_monthly': ('gesamt_deutschland_monthly.csv', {
+        'Jahr': 'int16',
+        'Monat': 'int8',
+        'export_wert': 'int64',
+        'import_wert': 'int64',
+        'handelsvolumen_wert': 'int64',
+    }),
+    'df_grouped': ('df_grouped.csv', {
+        'Land': 'category',
+        'Jahr': 'int16',
+        'export_wert': 'int64',
+        'import_wert': 'int64',
+        'handelsvolumen_wert': 'int64',
+        'handelsbilanz': 'int64',
+        'handelsbilanz_status': 'category',
+        'export_ranking': _RANKING,
+        'import_ranking': _RANKING,
+        'handelsvolumen_ranking': _RANKING,
+        'export_wachstum': 'float64',
+        'import_wachstum': 'float64',
+        'handelsvolumen_wachstum': 'float64',
+        'export_wachstum_ranking': _RANKING,
+        'import_wachstum_ranking': _RANKING,
+        'handelsvolumen_wachstum_ranking': _RANKING,
+        'export_differenz': 'float64',
+        'import_differenz': 'float64',
+        'handelsvolumen_differenz': 'float64',
+    }),
+    'aggregated_df': ('aggregated_df.csv', {
+        'Jahr': 'int16',
+        'Monat': 'int8',
+        'Code': 'category',
+        'Label': 'category',
+        'Ausfuhr: Wert': 'int64',
+        'Einfuhr: Wert': 'int64',
+        'Handelsvolumen': 'int64',
+    }),
+    'df_reduced': ('df_reduced.csv', {
+        'Jahr': 'int16',
+        'Label': 'category',
+        'Ausfuhr: Wert': 'int64',
+        'Einfuhr: Wert': 'int64',
+    }),
+}
+
+# Ladezeit und Speicherbedarf je Tabelle, gefüllt von load_table()
+load_stats = {}
+
+# 'lazy': Tabellen erst beim ersten Zugriff laden, 'eager': beim Start
+LOADING_MODE = os.environ.get('DATA_LOADING', 'lazy')
+
+# Tabellen als Memory-Map aus dem Store lesen: Die Spalten zeigen direkt in
+# die Datei, alle Worker teilen sich dieselben Seiten im Page-Cache.
+MMAP = os.environ.get('DATA_MMAP') == '1'
+
+# Sekunden zwischen zwei Prüfungen von data/ auf geänderte CSVs, 0 = aus
+WATCH_INTERVAL = float(os.environ.get('DATA_WATCH_INTERVAL', 30))
+
+
+def csv_path(name):
+    return os.path.join(DATA_DIR, TABLES[name][0])
+
+
+def store_path(name):
+    return os.path.join(STORE_DIR, f'{name}.arrow')
+
+
+def read_csv(name):
+    filename, schema = TABLES[name]
+    return pd.read_csv(os.path.join(DATA_DIR, filename), usecols=list(schema), dtype=schema)
+
+
+def file_version(name):
+    return os.stat(csv_path(name)).st_mtime_ns
+
+
+def is_stale(name):
+    path = store_path(name)
+    if not os.path.exists(path):
+        return True
+    return os.path.getmtime(csv_path(name)) > os.path.getmtime(path)
+
+
+def _to_arrow(df):
+    # NaN bleibt NaN statt Arrow-null, damit Float-Spalten ohne Kopie
+    # gemappt werden können; Kategorien werden zu Dictionary-Spalten.
+    columns = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            columns[col] = pa.DictionaryArray.from_arrays(
+                df[col].cat.codes.to_numpy(), pa.array(df[col].cat.categories.astype(str)))
+        else:
+            columns[col] = pa.array(df[col].to_numpy(), from_pandas=False)
+    return pa.table(columns)
+
+
+def convert_table(name):
+    df = read_csv(name)
+    os.makedirs(STORE_DIR, exist_ok=True)
+    # Erst in eine temporäre Datei schreiben, damit parallel startende
+    # Worker nie eine halb geschriebene Datei lesen.
+    tmp_path = f'{store_path(name)}.{os.getpid()}.tmp'
+    feather.write_feather(_to_arrow(df), tmp_path, compression='uncompressed')
+    os.replace(tmp_path, store_path(name))
+    return df
+
+
+def read_mapped(name):
+    table = feather.read_table(store_path(name), memory_map=True)
+    columns = {}
+    for col, chunked in zip(table.column_names, table.columns):
+        array = chunked.combine_chunks() if chunked.num_chunks != 1 else chunked.chunk(0)
+        if pa.types.is_dictionary(array.type):
+            columns[col] = pd.Categorical.from_codes(
+                array.indices.to_numpy(zero_copy_only=True),
+                categories=pd.Index(array.dictionary.to_pylist()),
+                validate=False)
+        else:
+            columns[col] = array.to_numpy(zero_copy_only=True)
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_table(name):
+    start = time.perf_counter()
+    source = 'store'
+    if is_stale(name):
+        df = convert_table(name)
+        source = 'csv'
+    if MMAP:
+        df = read_mapped(name)
+        source = 'mmap'
+    elif source == 'store':
+        df = pd.read_feather(store_path(name))
+    seconds = time.perf_counter() - start
+
+    nbytes = int(df.memory_usage(deep=True).sum())
+    load_stats[name] = {'source': source, 'rows': len(df), 'seconds': seconds, 'bytes': nbytes}
+    logger.info('%s aus %s geladen: %d Zeilen, %.1f ms, %.1f KiB',
+                name, source, len(df), seconds * 1e3, nbytes / 1024)
+    return df
+
+
+def load_all():
+    return {name: load_table(name) for name in TABLES}
+
+
+class Snapshot:
+    # Stand aller Tabellen und der daraus abgeleiteten Strukturen zu einer
+    # Datenversion. Tabellen werden innerhalb des Snapshots lazy geladen;
+    # ein Callback, der sich current() einmal holt, arbeitet bis zum Ende
+    # auf demselben Stand, auch wenn inzwischen ein neuer eingetauscht wurde.
+
+    def __init__(self, versions=None):
+        self.versions = versions or {name: file_version(name) for name in TABLES}
+        self._tables = {}
+        self._derived = {}
+        self._locks = {name: threading.Lock() for name in TABLES}
+        self._derived_lock = threading.Lock()
+
+    def version(self, names):
+        return tuple(self.versions[name] for name in names)
+
+    def table(self, name):
+        df = self._tables.get(name)
+        if df is not None:
+            return df
+        # Pro Tabelle eigenes Lock: gleichzeitige Anfragen warten auf denselben
+        # Ladevorgang, andere Tabellen werden davon nicht blockiert.
+        with self._locks[name]:
+            if name not in self._tables:
+                self._tables[name] = load_table(name)
+            return self._tables[name]
+
+    def derived(self, key, name, build):
+        # build(df) wird je Snapshot einmal ausgeführt
+        entry = self._derived.get(key)
+        if entry is not None:
+            return entry[2]
+        df = self.table(name)
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = (name, build, build(df))
+            return self._derived[key][2]
+
+    def resident(self):
+        return {name: int(df.memory_usage(deep=True).sum()) for name, df in list(self._tables.items())}
+
+    def successor(self, versions):
+        # Neuer Snapshot, der alles vorlädt, was in diesem bereits geladen war.
+        # Unveränderte Tabellen und ihre abgeleiteten Strukturen werden übernommen.
+        new = Snapshot(versions)
+        for name, df in list(self._tables.items()):
+            if versions[name] == self.versions[name]:
+                new._tables[name] = df
+            else:
+                new.table(name)
+        for key, (name, build, obj) in list(self._derived.items()):
+            if versions[name] == self.versions[name]:
+                new._derived[key] = (name, build, obj)
+                continue
+            # Strukturen mit updated(alt, neu) werden fortgeschrieben statt
+            # neu gebaut; None heißt, es geht nur mit einem Neuaufbau
+            update = getattr(obj, 'updated', None)
+            updated = update(self.table(name), new.table(name)) if update else None
+            if updated is None:
+                new.derived(key, name, build)
+            else:
+                new._derived[key] = (name, build, updated)
+        return new
+
+
+_current = Snapshot()
+_swap_lock = threading.Lock()
+
+
+def current():
+    return _current
+
+
+def get_table(name):
+    return _current.table(name)
+
+
+def get_derived(key, name, build):
+    return _current.derived(key, name, build)
+
+
+def data_version(names):
+    return _current.version(names)
+
+
+def refresh():
+    # Baut bei geänderten CSVs einen neuen Snapshot und tauscht ihn danach
+    # in einem Schritt ein. Schlägt das Laden fehl, bleibt der alte aktiv.
+    global _current
+    with _swap_lock:
+        versions = {name: file_version(name) for name in TABLES}
+        changed = [name for name in TABLES if versions[name] != _current.versions[name]]
+        if not changed:
+            return False
+        start = time.perf_counter()
+        _current = _current.successor(versions)
+    logger.info('Neuer Daten-Snapshot (%s) nach %.1f ms eingetauscht',
+                ', '.join(changed), (time.perf_counter() - start) * 1e3)
+    return True
+
+
+def _watch(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            refresh()
+        except Exception:
+            logger.exception('Neuladen der Daten fehlgeschlagen, alter Snapshot bleibt aktiv')
+
+
+_watcher = None
+
+
+def start_watcher(interval=None):
+    global _watcher
+    interval = WATCH_INTERVAL if interval is None else interval
+    if interval <= 0 or _watcher is not None:
+        return
+    _watcher = threading.Thread(target=_watch, args=(interval,), name='data-watcher', daemon=True)
+    _watcher.start()
+
+
+def warm_up(names, mode=None):
+    mode = mode or LOADING_MODE
+    if mode == 'eager':
+        for name in names:
+            get_table(name)
+    elif mode != 'lazy':
+        raise ValueError(f"Unbekannter Lademodus: {mode!r} (erwartet 'lazy' oder 'eager')")
+
+
+def resident_tables():
+    return _current.resident()
+
+
+def format_stats():
+    lines = [f"{'Tabelle':<28}{'Quelle':>8}{'Zeilen':>8}{'ms':>9}{'KiB':>10}"]
+    for name, stats in load_stats.items():
+        lines.append(f"{name:<28}{stats['source']:>8}{stats['rows']:>8}"
+                     f"{stats['seconds'] * 1e3:>9.1f}{stats['bytes'] / 1024:>10.1f}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    # Store neu aufbauen und Ladezeiten aus dem Store ausgeben
+    for name in TABLES:
+        convert_table(name)
+    load_all()
+    print(format_stats())
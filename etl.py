@@ -0,0 +1,248 @@
+import argparse
+import functools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import metrics_engine
+import sql_store
+
+# Erzeugt die fünf CSV-Dateien in data/ aus einem Rohexport der
+# Außenhandelsstatistik (Land × Ware × Monat). Der Rohexport wird in
+# Blöcken gelesen und nach Jahr in Partitionen geschrieben; die Jahre
+# werden danach parallel in einem Prozesspool aggregiert. Der Speicherbedarf
+# hängt damit von der Blockgröße und der Zahl der Schlüssel ab, nicht von
+# der Zeilenzahl des Exports.
+#
+#   python etl.py ROHEXPORT --sqlite data/handel.sqlite
+#   python etl.py --self-test    # Beispiel-Rohexport verarbeiten und prüfen
+
+# Spalten des Rohexports
+RAW_COLUMNS = ['Jahr', 'Monat', 'Land', 'Code', 'Label', 'Ausfuhr: Wert', 'Einfuhr: Wert']
+RAW_DTYPES = {
+    'Jahr': 'int16', 'Monat': 'int8', 'Land': 'str', 'Code': 'str', 'Label': 'str',
+    'Ausfuhr: Wert': 'int64', 'Einfuhr: Wert': 'int64',
+}
+VALUES = ['Ausfuhr: Wert', 'Einfuhr: Wert']
+
+CHUNKSIZE = 500_000
+# Ziel der echten Daten; Beispieldaten aus make_fixture() dürfen hier nicht landen
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+def partition_by_year(raw_path, work_dir, sep=';', chunksize=CHUNKSIZE, on_chunk=None):
+    # Rohexport blockweise lesen und je Jahr an eine Partitionsdatei anhängen
+    paths = {}
+    for chunk in pd.read_csv(raw_path, sep=sep, usecols=RAW_COLUMNS, dtype=RAW_DTYPES, chunksize=chunksize):
+        if on_chunk is not None:
+            on_chunk(chunk)
+        for jahr, part in chunk.groupby('Jahr', sort=False):
+            path = os.path.join(work_dir, f'{jahr}.csv')
+            part.to_csv(path, mode='a', header=jahr not in paths, index=False)
+            paths[jahr] = path
+    return [paths[jahr] for jahr in sorted(paths)]
+
+
+def aggregate_year(path, chunksize=CHUNKSIZE):
+    # Eine Jahrespartition zu Monatswerten je Ware und Jahreswerten je Land
+    goods, countries = [], []
+    for chunk in pd.read_csv(path, dtype=RAW_DTYPES, chunksize=chunksize):
+        goods.append(chunk.groupby(['Jahr', 'Monat', 'Code', 'Label'], sort=False)[VALUES].sum())
+        countries.append(chunk.groupby(['Land', 'Jahr'], sort=False)[VALUES].sum())
+    # Teilsummen der Blöcke zusammenfassen
+    return (pd.concat(goods).groupby(level=[0, 1, 2, 3]).sum(),
+            pd.concat(countries).groupby(level=[0, 1]).sum())
+
+
+def build_tables(goods, countries):
+    goods = goods.reset_index()
+    labels = goods.drop_duplicates('Code').set_index('Code')['Label']
+    goods = goods.groupby(['Jahr', 'Monat', 'Code'])[VALUES].sum()
+    # Jeder Monat mit jedem Code
+    monate = goods.index.droplevel('Code').unique()
+    codes = goods.index.unique(level='Code')
+    full = pd.MultiIndex.from_arrays([
+        np.repeat(monate.get_level_values('Jahr'), len(codes)),
+        np.repeat(monate.get_level_values('Monat'), len(codes)),
+        np.tile(codes, len(monate)),
+    ], names=['Jahr', 'Monat', 'Code'])
+    goods = goods.reindex(full, fill_value=0).reset_index()
+    goods.insert(3, 'Label', goods['Code'].map(labels))
+    goods['Handelsvolumen'] = goods['Ausfuhr: Wert'] + goods['Einfuhr: Wert']
+    aggregated_df = goods.sort_values(['Jahr', 'Monat', 'Code'], kind='stable').reset_index(drop=True)
+
+    df_reduced = metrics_engine.reduce_goods(aggregated_df)
+
+    monthly = aggregated_df.groupby(['Jahr', 'Monat'])[VALUES].sum().reset_index()
+    gesamt_deutschland_monthly = pd.DataFrame({
+        'Jahr': monthly['Jahr'],
+        'Monat': monthly['Monat'],
+        'export_wert': monthly['Ausfuhr: Wert'],
+        'import_wert': monthly['Einfuhr: Wert'],
+        'handelsvolumen_wert': monthly['Ausfuhr: Wert'] + monthly['Einfuhr: Wert'],
+    })
+
+    yearly = gesamt_deutschland_monthly.groupby('Jahr')[['export_wert', 'import_wert']].sum().reset_index()
+    gesamt_deutschland = pd.DataFrame({
+        'Jahr': yearly['Jahr'],
+        'gesamt_export': yearly['export_wert'],
+        'gesamt_import': yearly['import_wert'],
+        'gesamt_handelsvolumen': yearly['export_wert'] + yearly['import_wert'],
+    })
+
+    countries = countries.groupby(level=['Land', 'Jahr']).sum()
+    full = pd.MultiIndex.from_product(
+        [sorted(countries.index.unique(level='Land')), sorted(countries.index.unique(level='Jahr'))],
+        names=['Land', 'Jahr'])
+    raw = countries.reindex(full, fill_value=0).reset_index().rename(columns=metrics_engine.GOODS_COLUMNS)
+    df_grouped = metrics_engine.derive_metrics(raw)
+
+    return {
+        '1gesamt_deutschland.csv': gesamt_deutschland,
+        'gesamt_deutschland_monthly.csv': gesamt_deutschland_monthly,
+        'df_grouped.csv': df_grouped,
+        'aggregated_df.csv': aggregated_df,
+        'df_reduced.csv': df_reduced,
+    }
+
+
+def write_tables(tables, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    for filename, df in tables.items():
+        # Atomar ersetzen, damit der Daten-Watcher nie eine halbe Datei liest
+        path = os.path.join(out_dir, filename)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+
+def run(raw_path, out_dir, sep=';', jobs=None, chunksize=CHUNKSIZE, sqlite_path=None):
+    work_dir = tempfile.mkdtemp(prefix='etl-')
+    # Optional die Detailzeilen Land × Ware × Monat für das SQL-Backend mitschreiben
+    if sqlite_path:
+        os.makedirs(os.path.dirname(os.path.abspath(sqlite_path)), exist_ok=True)
+    conn = sql_store.connect(sqlite_path) if sqlite_path else None
+    try:
+        start = time.perf_counter()
+        on_chunk = None
+        if conn is not None:
+            sql_store.clear_detail(conn)
+            on_chunk = functools.partial(sql_store.append_detail, conn)
+        partitions = partition_by_year(raw_path, work_dir, sep, chunksize, on_chunk)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(aggregate_year, partitions, [chunksize] * len(partitions)))
+        tables = build_tables(pd.concat([g for g, _ in results]), pd.concat([c for _, c in results]))
+        write_tables(tables, out_dir)
+        if conn is not None:
+            sql_store.load_tables(conn, out_dir)
+            sql_store.finish(conn)
+        return len(partitions), time.perf_counter() - start
+    finally:
+        if conn is not None:
+            conn.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def check_outputs(out_dir):
+    # Die fünf Dateien müssen untereinander dieselben Summen ergeben
+    read = lambda filename: pd.read_csv(os.path.join(out_dir, filename))
+    gesamt = read('1gesamt_deutschland.csv')
+    monthly = read('gesamt_deutschland_monthly.csv')
+    grouped = read('df_grouped.csv')
+    aggregated = read('aggregated_df.csv')
+    reduced = read('df_reduced.csv')
+
+    problems = []
+    goods_monthly = aggregated.groupby(['Jahr', 'Monat'])['Ausfuhr: Wert'].sum().to_numpy()
+    if not np.array_equal(goods_monthly, monthly['export_wert'].to_numpy()):
+        problems.append('Monatssummen der Waren weichen von gesamt_deutschland_monthly ab')
+    if not np.array_equal(grouped.groupby('Jahr')['export_wert'].sum().to_numpy(), gesamt['gesamt_export'].to_numpy()):
+        problems.append('Jahressummen der Länder weichen von 1gesamt_deutschland ab')
+    if not np.array_equal(reduced.groupby('Jahr')['Einfuhr: Wert'].sum().to_numpy(), gesamt['gesamt_import'].to_numpy()):
+        problems.append('Jahressummen aus df_reduced weichen von 1gesamt_deutschland ab')
+    return problems
+
+
+def make_fixture(path, years=range(2019, 2025), seed=0):
+    # Kleiner, deterministischer Rohexport zum Testen ohne Netzwerk
+    rng = np.random.default_rng(seed)
+    countries = ['China', 'Frankreich', 'Niederlande', 'Polen', 'Vereinigte Staaten von Amerika', 'Nauru']
+    goods = [('WA01', 'Lebende Tiere'), ('WA02', 'Fleisch'), ('WA76', 'Aluminium und Waren daraus'),
+             ('WA84', 'Maschinen, Apparate, mechanische Geräte'), ('WA87', 'Kraftfahrzeuge, Landfahrzeuge')]
+    rows = [(jahr, monat, land, code, label)
+            for jahr in years for monat in range(1, 13) for land in countries for code, label in goods]
+    df = pd.DataFrame(rows, columns=RAW_COLUMNS[:5])
+    for col in VALUES:
+        values = rng.integers(0, 5_000_000, len(df)) * 1000
+        # Einige Länder ohne Handel in einzelnen Jahren, damit Wachstum aus 0 vorkommt
+        values[(df['Land'] == 'Nauru') & (df['Jahr'] % 3 == 0)] = 0
+        df[col] = values
+    df.sample(frac=1, random_state=seed).to_csv(path, sep=';', index=False)
+    return len(df)
+
+
+def self_test(jobs=None):
+    # Ganzer Lauf gegen den Beispiel-Rohexport in einem temporären
+    # Verzeichnis: make_fixture(), run() samt SQLite, check_outputs()
+    tmp_dir = tempfile.mkdtemp(prefix='etl-test-')
+    try:
+        raw_path = os.path.join(tmp_dir, 'raw.csv')
+        out_dir = os.path.join(tmp_dir, 'out')
+        sqlite_path = os.path.join(out_dir, 'handel.sqlite')
+        rows = make_fixture(raw_path)
+        run(raw_path, out_dir, jobs=jobs, sqlite_path=sqlite_path)
+        problems = check_outputs(out_dir)
+        conn = sql_store.connect(sqlite_path)
+        try:
+            detail_rows, = conn.execute('SELECT COUNT(*) FROM handel_detail').fetchone()
+        finally:
+            conn.close()
+        if detail_rows != rows:
+            problems.append(f'handel_detail hat {detail_rows} statt {rows} Zeilen')
+        return problems
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Erzeugt die CSV-Dateien in data/ aus einem Rohexport')
+    parser.add_argument('raw', nargs='?', help='Rohexport (CSV, Spalten: ' + ', '.join(RAW_COLUMNS) + ')')
+    parser.add_argument('--out', default=DATA_DIR)
+    parser.add_argument('--sep', default=';')
+    parser.add_argument('--jobs', type=int, default=None, help='Prozesse im Pool (Standard: Anzahl CPUs)')
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    parser.add_argument('--sqlite', metavar='PATH', help='Zusätzlich die SQLite-Datenbank mit Detaildaten schreiben')
+    parser.add_argument('--make-fixture', action='store_true', help='Zuerst einen Beispiel-Rohexport unter RAW erzeugen')
+    parser.add_argument('--self-test', action='store_true',
+                        help='Beispiel-Rohexport in einem temporären Verzeichnis verarbeiten und prüfen')
+    args = parser.parse_args()
+
+    if args.self_test:
+        problems = self_test(args.jobs)
+        for problem in problems:
+            print(problem)
+        print('Selbsttest fehlgeschlagen' if problems else 'Selbsttest bestanden')
+        raise SystemExit(1 if problems else 0)
+    if args.raw is None:
+        parser.error('RAW fehlt')
+    if args.make_fixture and os.path.realpath(args.out) == os.path.realpath(DATA_DIR):
+        parser.error('--make-fixture würde die Dateien in data/ durch Beispieldaten ersetzen; '
+                     '--out auf ein anderes Verzeichnis setzen')
+    if args.make_fixture:
+        print(f'Beispiel-Rohexport mit {make_fixture(args.raw)} Zeilen geschrieben: {args.raw}')
+    years, seconds = run(args.raw, args.out, args.sep, args.jobs, args.chunksize, args.sqlite)
+    print(f'{years} Jahre in {seconds:.2f} s verarbeitet, Ausgabe in {args.out}')
+    problems = check_outputs(args.out)
+    for problem in problems:
+        print(problem)
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
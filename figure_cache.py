@@ -0,0 +1,80 @@
+import functools
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from plotly.io.json import to_json_plotly
+
+import instrumentation
+
+MAXSIZE = int(os.environ.get('FIGURE_CACHE_SIZE', 256))
+
+# Schlüssel -> serialisiertes Figure-JSON, älteste Einträge zuerst
+_entries = OrderedDict()
+_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+# Länge des zuletzt gelieferten Payloads je Thread, für figure_patch
+_last = threading.local()
+
+
+def get(key):
+    with _lock:
+        payload = _entries.get(key)
+        if payload is None:
+            _counters['misses'] += 1
+            return None
+        _entries.move_to_end(key)
+        _counters['hits'] += 1
+        return payload
+
+
+def put(key, payload):
+    with _lock:
+        _entries[key] = payload
+        _entries.move_to_end(key)
+        while len(_entries) > MAXSIZE:
+            _entries.popitem(last=False)
+            _counters['evictions'] += 1
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def stats():
+    with _lock:
+        return {
+            **_counters,
+            'size': len(_entries),
+            'maxsize': MAXSIZE,
+            'bytes': sum(len(payload) for payload in _entries.values()),
+        }
+
+
+def take_payload_size():
+    # Bytes der zuletzt in diesem Thread gelieferten Figure, danach None
+    size, _last.size = getattr(_last, 'size', None), None
+    return size
+
+
+def cached_figure(version):
+    # version(pathname) liefert die Datenversion der Route; ändern sich die
+    # Dateien, ergibt sich ein neuer Schlüssel und alte Einträge laufen aus.
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(pathname, year_selected):
+            key = (func.__name__, pathname, year_selected, version(pathname))
+            payload = get(key)
+            if payload is None:
+                fig = func(pathname, year_selected)
+                with instrumentation.phase('serialization'):
+                    payload = to_json_plotly(fig)
+                put(key, payload)
+            _last.size = len(payload)
+            with instrumentation.phase('serialization'):
+                return json.loads(payload)
+        wrapper.uncached = func
+        return wrapper
+    return decorator
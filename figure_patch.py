@@ -0,0 +1,100 @@
+import functools
+import os
+import threading
+
+from dash import Patch, ctx, no_update
+from dash.exceptions import MissingCallbackContextException
+from plotly.io.json import to_json_plotly
+
+import figure_cache
+
+# Ändert sich nur das Jahr, bleibt die Struktur der Figure gleich. Statt der
+# ganzen Figure (inkl. Template, Hovertemplates und Achsen) werden dann nur
+# x/y der Traces, der Titel und die Y-Ticks als dash.Patch geschickt.
+
+# Callback -> gesendete Bytes mit ganzer Figure bzw. mit Patch
+_payload_stats = {}
+_lock = threading.Lock()
+# Jeder wievielte Patch je Callback für die Größenstatistik serialisiert wird
+PATCH_SAMPLE = int(os.environ.get('FIGURE_PATCH_SAMPLE', 10))
+
+
+def figure_patch(fig):
+    if not fig or not fig.get('data'):
+        return no_update
+    patch = Patch()
+    for i, trace in enumerate(fig['data']):
+        patch['data'][i]['x'] = trace['x']
+        patch['data'][i]['y'] = trace['y']
+    layout = fig['layout']
+    if 'title' in layout:
+        patch['layout']['title'] = layout['title']
+    yaxis = layout.get('yaxis', {})
+    for key in ('tickvals', 'ticktext'):
+        if key in yaxis:
+            patch['layout']['yaxis'][key] = yaxis[key]
+    return patch
+
+
+def _record(name, full, sent):
+    # Größe der ganzen Figure aus dem Cache-Payload. Patches werden nur bei
+    # jedem PATCH_SAMPLE-ten Mal serialisiert; payload_stats() rechnet mit
+    # dem Mittelwert der gemessenen hoch.
+    full_bytes = figure_cache.take_payload_size()
+    if full_bytes is None:
+        full_bytes = len(to_json_plotly(full))
+    patch = sent is not full and sent is not no_update
+    with _lock:
+        stats = _payload_stats.setdefault(name, {'calls': 0, 'patched': 0, 'full_bytes': 0, 'sent_full_bytes': 0,
+                                                 'patches': 0, 'sampled': 0, 'sampled_bytes': 0})
+        stats['calls'] += 1
+        stats['patched'] += sent is not full
+        stats['full_bytes'] += full_bytes
+        stats['sent_full_bytes'] += full_bytes if sent is full else 0
+        stats['patches'] += patch
+        sample = patch and (stats['patches'] - 1) % PATCH_SAMPLE == 0
+    if sample:
+        patch_bytes = len(to_json_plotly(sent))
+        with _lock:
+            stats['sampled'] += 1
+            stats['sampled_bytes'] += patch_bytes
+
+
+def payload_stats():
+    result = {}
+    with _lock:
+        for name, stats in _payload_stats.items():
+            patch_bytes = stats['sampled_bytes'] / stats['sampled'] if stats['sampled'] else 0
+            result[name] = {
+                'calls': stats['calls'],
+                'patched': stats['patched'],
+                'full_bytes': stats['full_bytes'],
+                'sent_bytes': stats['sent_full_bytes'] + round(stats['patches'] * patch_bytes),
+                'sampled_patches': stats['sampled'],
+            }
+    return result
+
+
+def _year_only(year_input):
+    try:
+        return set(ctx.triggered_prop_ids) == {f'{year_input}.value'}
+    except MissingCallbackContextException:
+        return False  # Aufruf außerhalb eines Callbacks, z. B. beim Vorwärmen
+
+
+def patch_on_year_change(year_input='jahr_dropdown'):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(pathname, year_selected):
+            figure_cache.take_payload_size()
+            result = func(pathname, year_selected)
+            if not _year_only(year_input):
+                sent = result
+            elif isinstance(result, (list, tuple)):
+                sent = [figure_patch(fig) for fig in result]
+            else:
+                sent = figure_patch(result)
+            _record(func.__name__, result, sent)
+            return sent
+        return wrapper
+    return decorator
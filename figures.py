@@ -0,0 +1,85 @@
+import plotly.io as pio
+
+# Baut Figures direkt als dict, wie dcc.Graph sie erwartet. Anders als
+# go.Figure() findet dabei keine Validierung der einzelnen Properties statt.
+
+EXPORT_COLOR = '#1f77b4'
+IMPORT_COLOR = '#ff7f0e'
+HANDELSVOLUMEN_COLOR = '#2ca02c'
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
+
+# Standard-Template einmalig auflösen, damit die Graphen wie mit go.Figure() aussehen
+TEMPLATE = pio.templates[pio.templates.default].to_plotly_json()
+
+
+def _values(values):
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+
+def line_trace(x, y, name, color, x_label, value_format='%{y:,.0f} €'):
+    # color=None überlässt die Farbe der Farbpalette des Templates
+    line = {'width': 2} if color is None else {'width': 2, 'color': color}
+    return {
+        'type': 'scatter',
+        'x': _values(x),
+        'y': _values(y),
+        'mode': 'lines+markers',
+        'name': name,
+        'line': line,
+        'hovertemplate': f'<b>{name}</b><br>{x_label}: %{{x}}<br>Wert: {value_format}<extra></extra>',
+    }
+
+
+def bar_trace(x, y, name, color):
+    return {
+        'type': 'bar',
+        'x': _values(x),
+        'y': _values(y),
+        'name': name,
+        'marker': {'color': color},
+    }
+
+
+def axis(title=None, tickvals=None, ticktext=None, **kwargs):
+    result = dict(kwargs)
+    if title is not None:
+        result['title'] = {'text': title}
+    if tickvals is not None:
+        result['tickvals'] = _values(tickvals)
+    if ticktext is not None:
+        result['ticktext'] = _values(ticktext)
+    return result
+
+
+# Achsenbeschriftung in K/Mio/Mrd, u. a. für die Y-Ticks der Monatsgraphen
+def formatter(value):
+    if value >= 1e9:
+        return f'{value / 1e9:.0f} Mrd'
+    elif value >= 1e6:
+        return f'{value / 1e6:.0f} Mio'
+    elif value >= 1e3:
+        return f'{value / 1e3:.0f} K'
+    else:
+        return str(value)
+
+
+def figure(traces, title=None, xaxis=None, yaxis=None, legend=None):
+    layout = {'template': TEMPLATE}
+    if title is not None:
+        layout['title'] = {'text': title}
+    if xaxis:
+        layout['xaxis'] = xaxis
+    if yaxis:
+        layout['yaxis'] = yaxis
+    if legend:
+        layout['legend'] = legend
+    return {'data': traces, 'layout': layout}
+
+
+def legend(title):
+    return {'title': {'text': title}, 'bgcolor': 'rgba(255,255,255,0.7)'}
+
+
+def empty_figure():
+    return figure([])
@@ -0,0 +1,227 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import data_store
+import rollups
+
+# Prognosen für Export und Import: Deutschland gesamt und jeder WA-Code
+# monatlich (Holt-Winters mit Trend und 12-Monats-Saison), jedes Land
+# jährlich (gedämpfter Trend, df_grouped hat keine Monatswerte). Angepasst
+# wird im Batch über einen Prozess-Pool; Parameter und Prognosen landen in
+# einem versionierten Cache. Neu angepasst werden nur Reihen, deren Werte
+# sich geändert haben. Die Seite /prognose liest nur den Cache.
+#
+#   python forecast.py --jobs 8 --months 24
+
+CACHE_PATH = os.environ.get('FORECAST_CACHE', os.path.join(data_store.DATA_DIR, 'forecasts', 'forecasts.json'))
+HORIZON_MONTHS = int(os.environ.get('FORECAST_MONTHS', 24))
+# Erhöhen, wenn sich die Modelle ändern: dann wird alles neu angepasst
+FORMAT = 1
+
+# Kennzahl -> Spalte in gesamt_deutschland_monthly/df_grouped bzw. aggregated_df
+MEASURES = {
+    'export': ('export_wert', 'Ausfuhr: Wert'),
+    'import': ('import_wert', 'Einfuhr: Wert'),
+}
+KINDS = {'gesamt': 'Deutschland gesamt', 'land': 'Land', 'ware': 'Ware'}
+
+
+def series_key(kind, name, measure):
+    return f'{kind}:{name}:{measure}'
+
+
+def _month_labels(jahre, monate):
+    return [f'{int(jahr)}-{int(monat):02d}' for jahr, monat in zip(jahre, monate)]
+
+
+def gesamt_series(measure):
+    df = data_store.get_table('gesamt_deutschland_monthly').sort_values(['Jahr', 'Monat'])
+    return 'M', _month_labels(df['Jahr'], df['Monat']), df[MEASURES[measure][0]].to_numpy(dtype='float64')
+
+
+def land_series(land, measure):
+    df = data_store.get_table('df_grouped')
+    df = df[df['Land'] == land].sort_values('Jahr')
+    return 'Y', df['Jahr'].astype(int).tolist(), df[MEASURES[measure][0]].to_numpy(dtype='float64')
+
+
+def ware_series(code, measure, rollup=None):
+    rollup = rollup or data_store.get_derived('time_rollup', 'aggregated_df', rollups.TimeRollup)
+    present = rollup.months_present
+    yi, mi = np.nonzero(present)
+    values = rollup.monthly[rollup.code_index[code], :, :, rollup.measure_index[MEASURES[measure][1]]][present]
+    return 'M', _month_labels(rollup.years[yi], mi + 1), values.astype('float64')
+
+
+def history(kind, name, measure):
+    if kind == 'gesamt':
+        return gesamt_series(measure)
+    if kind == 'land':
+        return land_series(name, measure)
+    return ware_series(name, measure)
+
+
+def names(kind):
+    if kind == 'gesamt':
+        return ['gesamt']
+    if kind == 'land':
+        return sorted(data_store.get_table('df_grouped')['Land'].unique())
+    return list(data_store.get_derived('time_rollup', 'aggregated_df', rollups.TimeRollup).codes)
+
+
+def all_series():
+    # (Schlüssel, Frequenz, Beschriftungen, Werte) für alle Reihen
+    rollup = data_store.get_derived('time_rollup', 'aggregated_df', rollups.TimeRollup)
+    for measure in MEASURES:
+        yield (series_key('gesamt', 'gesamt', measure),) + gesamt_series(measure)
+        grouped = data_store.get_table('df_grouped').sort_values('Jahr')
+        for land, df in grouped.groupby('Land', observed=True):
+            yield (series_key('land', land, measure), 'Y', df['Jahr'].astype(int).tolist(),
+                   df[MEASURES[measure][0]].to_numpy(dtype='float64'))
+        for code in rollup.codes:
+            yield (series_key('ware', code, measure),) + ware_series(code, measure, rollup)
+
+
+def series_hash(freq, values, horizon):
+    digest = hashlib.sha1(f'{FORMAT}:{freq}:{horizon}:'.encode())
+    digest.update(np.ascontiguousarray(values, dtype='float64').tobytes())
+    return digest.hexdigest()
+
+
+def future_labels(freq, last, steps):
+    if freq == 'Y':
+        return [last + i for i in range(1, steps + 1)]
+    jahr, monat = map(int, last.split('-'))
+    labels = []
+    for _ in range(steps):
+        jahr, monat = (jahr + 1, 1) if monat == 12 else (jahr, monat + 1)
+        labels.append(f'{jahr}-{monat:02d}')
+    return labels
+
+
+def fit(freq, values, steps):
+    # Läuft im Prozess-Pool; liefert (Modell, Parameter, Prognose)
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            if freq == 'M' and len(values) >= 24:
+                model, result = 'holt-winters', ExponentialSmoothing(
+                    values, trend='add', seasonal='add', seasonal_periods=12).fit()
+            elif len(values) >= 4 and np.ptp(values) > 0:
+                model, result = 'gedaempfter-trend', ExponentialSmoothing(
+                    values, trend='add', damped_trend=True).fit()
+            else:
+                raise ValueError('Reihe zu kurz oder konstant')
+        forecast = result.forecast(steps)
+        if not np.all(np.isfinite(forecast)):
+            raise ValueError('Prognose nicht endlich')
+        params = {name: float(value) for name, value in result.params.items()
+                  if np.isscalar(value) and np.isfinite(value)}
+    except (ValueError, np.linalg.LinAlgError):
+        # Letzten Wert fortschreiben
+        model, params = 'naiv', {}
+        forecast = np.full(steps, values[-1] if len(values) else 0.0)
+    # Handelswerte sind nicht negativ
+    return model, params, np.maximum(forecast, 0).tolist()
+
+
+def _fit_task(task):
+    key, freq, values, steps = task
+    return key, fit(freq, values, steps)
+
+
+def read_cache(path=CACHE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        cache = json.load(f)
+    return cache if cache.get('format') == FORMAT else None
+
+
+def write_cache(cache, path=CACHE_PATH):
+    # Erst temporär schreiben, damit die Seite nie eine halbe Datei liest
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def run(path=CACHE_PATH, months=HORIZON_MONTHS, jobs=None, force=False):
+    old = {} if force else (read_cache(path) or {}).get('series', {})
+    series, tasks = {}, []
+    for key, freq, x, values in all_series():
+        if len(values) == 0:
+            continue
+        steps = months if freq == 'M' else -(-months // 12)
+        digest = series_hash(freq, values, steps)
+        entry = old.get(key)
+        if entry is not None and entry['hash'] == digest:
+            series[key] = entry
+            continue
+        series[key] = {'hash': digest, 'freq': freq, 'x': future_labels(freq, x[-1], steps)}
+        tasks.append((key, freq, values, steps))
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for key, (model, params, forecast) in pool.map(_fit_task, tasks, chunksize=16):
+            series[key].update(model=model, params=params, forecast=forecast)
+
+    write_cache({
+        'format': FORMAT,
+        'months': months,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'data_version': dict(zip(data_store.TABLES, data_store.data_version(list(data_store.TABLES)))),
+        'series': series,
+    }, path)
+    return len(tasks), len(series) - len(tasks)
+
+
+# Cache für die Seite, neu gelesen nur wenn sich die Datei geändert hat
+_loaded = (None, None)
+_lock = threading.Lock()
+
+
+def cache_version(path=CACHE_PATH):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def load(path=CACHE_PATH):
+    global _loaded
+    version = cache_version(path)
+    with _lock:
+        if _loaded[0] != version:
+            _loaded = (version, read_cache(path) if version is not None else None)
+        return _loaded[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Passt die Prognosemodelle an und schreibt den Prognose-Cache')
+    parser.add_argument('--out', default=CACHE_PATH)
+    parser.add_argument('--months', type=int, default=HORIZON_MONTHS, choices=range(12, 25), metavar='12..24',
+                        help='Prognosehorizont in Monaten')
+    parser.add_argument('--jobs', type=int, default=None, help='Prozesse im Pool (Standard: Anzahl CPUs)')
+    parser.add_argument('--force', action='store_true', help='Alle Reihen neu anpassen')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    fitted, reused = run(args.out, args.months, args.jobs, args.force)
+    print(f'{fitted} Reihen angepasst, {reused} unverändert übernommen, '
+          f'{time.perf_counter() - start:.2f} s, Cache: {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+import os
+import re
+import unicodedata
+from collections import Counter
+
+# Suchindex über die Warenliste (Code/Label aus aggregated_df) für die
+# Warenauswahl: Präfix-Trie über die Wörter von Label und Code, dazu
+# Trigramme je Wort für Tippfehler. Umlaute werden im Index zu a/o/u; im
+# Suchtext wird zusätzlich ae/oe/ue als Umlaut gelesen, "Müll", "Muell" und
+# "Mull" finden also dasselbe. Das Dropdown bekommt nur die Treffer,
+# höchstens MAX_OPTIONS, nicht die ganze Liste.
+
+MAX_OPTIONS = int(os.environ.get('GOODS_SEARCH_LIMIT', 20))
+# Mindestanteil gemeinsamer Trigramme (Dice) zwischen Suchwort und dem
+# ähnlichsten Wort der Ware, gemittelt über die Suchwörter
+MIN_SIMILARITY = 0.4
+
+_FOLD = str.maketrans({'ä': 'a', 'ö': 'o', 'ü': 'u', 'ß': 'ss'})
+_DIGRAPHS = re.compile(r'(?<=[aou])e')
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text):
+    # Kleinschreibung, Umlaute auf a/o/u, Akzente weg, nur Buchstaben und Ziffern
+    text = str(text).lower().translate(_FOLD)
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return ' '.join(_NON_WORD.sub(' ', text).split())
+
+
+def query_variants(text):
+    # Suchtext wie getippt und, falls ae/oe/ue vorkommen, als Umlaut gelesen
+    # ("muell" -> "mull"); im Index bleibt "Feuer" also "feuer"
+    query = normalize(text)
+    folded = _DIGRAPHS.sub('', query)
+    return [query] if folded == query else [query, folded]
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class GoodsIndex:
+
+    def __init__(self, df):
+        pairs = df[['Code', 'Label']].drop_duplicates('Code').sort_values('Code')
+        self.codes = pairs['Code'].astype(str).to_numpy(dtype=object)
+        self.labels = pairs['Label'].astype(str).to_numpy(dtype=object)
+        self.code_index = {code: i for i, code in enumerate(self.codes)}
+
+        # Trie als verschachtelte dicts; '' hält die Einträge, bei denen ein
+        # Wort mit dem Präfix bis hierher beginnt (aufsteigend sortiert)
+        trie = {}
+        self._texts = []
+        # Wortschatz: Wort -> Waren; Trigramme zeigen auf Wörter, nicht auf
+        # ganze Labels, damit ein Tippfehler in einem Wort nicht in einem
+        # langen Label untergeht
+        word_items = {}
+        for i, (code, label) in enumerate(zip(self.codes, self.labels)):
+            text = normalize(f'{code} {label}')
+            self._texts.append(text)
+            # WA-Codes auch ohne Präfix ("76" für WA76)
+            words = set(text.split()) | {normalize(code).removeprefix('wa')}
+            for word in words:
+                word_items.setdefault(word, []).append(i)
+                node = trie
+                for char in word:
+                    node = node.setdefault(char, {})
+                    node.setdefault('', []).append(i)
+        self._trie = self._freeze(trie)
+
+        self._words = list(word_items)
+        self._word_items = [tuple(word_items[word]) for word in self._words]
+        self._word_gram_counts = []
+        postings = {}
+        for w, word in enumerate(self._words):
+            grams = trigrams(word)
+            self._word_gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(w)
+        self._postings = {gram: tuple(ids) for gram, ids in postings.items()}
+
+    def _freeze(self, node):
+        return {key: tuple(sorted(set(value))) if key == '' else self._freeze(value) for key, value in node.items()}
+
+    def _prefix(self, word):
+        node = self._trie
+        for char in word:
+            node = node.get(char)
+            if node is None:
+                return ()
+        return node['']
+
+    def _word_scores(self, query_word):
+        # Ware -> Dice-Wert ihres ähnlichsten Worts
+        grams = trigrams(query_word)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        best = {}
+        for w, count in shared.items():
+            score = 2 * count / (len(grams) + self._word_gram_counts[w])
+            for i in self._word_items[w]:
+                if score > best.get(i, 0):
+                    best[i] = score
+        return best
+
+    def _fuzzy(self, query, exclude):
+        # Ware -> mittlerer Wert über die Suchwörter
+        words = query.split()
+        total = Counter()
+        for word in words:
+            total.update(self._word_scores(word))
+        return {i: score / len(words) for i, score in total.items()
+                if i not in exclude and score / len(words) >= MIN_SIMILARITY}
+
+    def _prefix_hits(self, query):
+        words = query.split()
+        hits = set(self._prefix(words[0]))
+        for word in words[1:]:
+            hits.intersection_update(self._prefix(word))
+        return hits
+
+    def search(self, text, limit=MAX_OPTIONS):
+        # Indizes der Treffer: erst alle Wörter als Präfix (Label beginnt mit
+        # dem Suchtext zuerst), dann unscharf über Trigramme
+        queries = [query for query in query_variants(text or '') if query]
+        if not queries:
+            return list(range(min(limit, len(self.codes))))
+        hits = set().union(*(self._prefix_hits(query) for query in queries))
+        hits_sorted = sorted(hits)
+        starts = [any(self._texts[i].split(' ', 1)[-1].startswith(query) for query in queries) for i in hits_sorted]
+        ordered = [i for i, start in zip(hits_sorted, starts) if start] + \
+                  [i for i, start in zip(hits_sorted, starts) if not start]
+        if len(ordered) < limit:
+            scores = {}
+            for query in queries:
+                for i, score in self._fuzzy(query, hits).items():
+                    scores[i] = max(score, scores.get(i, 0))
+            ordered += sorted(scores, key=lambda i: (-scores[i], i))[:limit - len(ordered)]
+        return ordered[:limit]
+
+    def option(self, i):
+        return {'label': f'{self.codes[i]} {self.labels[i]}', 'value': self.codes[i]}
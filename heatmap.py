@@ -0,0 +1,133 @@
+import base64
+import os
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import data_access
+import data_store
+
+# Matrix Land × Monat für die Heatmap aller Handelspartner. Mit dem
+# SQL-Backend und Detaildaten aus den echten Monatswerten je Land, sonst
+# geschätzt: Jahreswert des Landes aus df_grouped, verteilt nach dem
+# Monatsanteil Deutschlands gesamt im selben Jahr. An den Browser geht immer
+# nur der sichtbare Ausschnitt, bei vielen Zellen zu Blöcken gemittelt, als
+# base64-kodiertes Typed Array (plotly.js liest {dtype, bdata, shape} direkt).
+
+TABLES = ['df_grouped', 'gesamt_deutschland_monthly']
+MEASURES = ['export_wert', 'import_wert', 'handelsvolumen_wert']
+
+# Höchstens so viele Zeilen und Spalten gehen an den Browser
+MAX_ROWS = int(os.environ.get('HEATMAP_MAX_ROWS', 80))
+MAX_COLUMNS = int(os.environ.get('HEATMAP_MAX_COLUMNS', 120))
+# Monatsblöcke beim Vergröbern: Monat, Quartal, Halbjahr, Jahr, ...
+MONTH_BLOCKS = [1, 2, 3, 6, 12, 24, 48]
+
+
+def typed_array(values, dtype='f4'):
+    values = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<'))
+    return {
+        'dtype': dtype,
+        'bdata': base64.b64encode(values.tobytes()).decode(),
+        'shape': ', '.join(str(size) for size in values.shape),
+    }
+
+
+class CountryMonths:
+
+    def __init__(self, countries, months, values, estimated):
+        # values: Kennzahl × Land × Monat, NaN für fehlende Monate. Länder
+        # absteigend nach Handelsvolumen, damit benachbarte Zeilen in einem
+        # Block ähnlich groß sind.
+        order = np.argsort(-np.nan_to_num(values[MEASURES.index('handelsvolumen_wert')]).sum(axis=1), kind='stable')
+        self.countries = np.asarray(countries, dtype=object)[order]
+        self.months = list(months)
+        self.values = values[:, order, :].astype(np.float32)
+        self.estimated = estimated
+
+    @classmethod
+    def from_detail(cls, rows):
+        df = pd.DataFrame(rows, columns=['Land', 'Jahr', 'Monat', 'export_wert', 'import_wert'])
+        df['handelsvolumen_wert'] = df['export_wert'] + df['import_wert']
+        df['Zeitpunkt'] = df['Jahr'] * 12 + df['Monat'] - 1
+        return cls._pivot(df, estimated=False)
+
+    @classmethod
+    def estimate(cls, grouped, monthly):
+        # Monatsanteil Deutschlands je Jahr und Kennzahl
+        monthly = monthly[['Jahr', 'Monat'] + MEASURES].copy()
+        totals = monthly.groupby('Jahr')[MEASURES].transform('sum')
+        shares = monthly[MEASURES] / totals.where(totals != 0)
+        shares[['Jahr', 'Monat']] = monthly[['Jahr', 'Monat']]
+        df = grouped[['Land', 'Jahr'] + MEASURES].merge(shares, on='Jahr', suffixes=('', '_anteil'))
+        for measure in MEASURES:
+            df[measure] = df[measure] * df[f'{measure}_anteil']
+        df['Zeitpunkt'] = df['Jahr'] * 12 + df['Monat'] - 1
+        return cls._pivot(df, estimated=True)
+
+    @classmethod
+    def _pivot(cls, df, estimated):
+        countries = np.sort(df['Land'].astype(str).unique())
+        first, last = int(df['Zeitpunkt'].min()), int(df['Zeitpunkt'].max())
+        months = [f'{t // 12}-{t % 12 + 1:02d}' for t in range(first, last + 1)]
+        ci = np.searchsorted(countries, df['Land'].astype(str).to_numpy())
+        ti = df['Zeitpunkt'].to_numpy(dtype=np.intp) - first
+        values = np.full((len(MEASURES), len(countries), len(months)), np.nan)
+        for i, measure in enumerate(MEASURES):
+            values[i, ci, ti] = df[measure].to_numpy(dtype='float64')
+        return cls(countries, months, values, estimated)
+
+    def window(self, measure, rows=None, columns=None, max_rows=MAX_ROWS, max_columns=MAX_COLUMNS):
+        # Ausschnitt [von, bis) in Zeilen und Spalten, auf Blockgrenzen
+        # erweitert; Blockgröße so, dass höchstens max_rows × max_columns
+        # Zellen übrig bleiben. Blöcke werden gemittelt, fehlende Monate zählen
+        # nicht mit.
+        r0, r1 = _clip(rows, len(self.countries))
+        c0, c1 = _clip(columns, len(self.months))
+        by = -(-(r1 - r0) // max_rows)
+        bx = next((b for b in MONTH_BLOCKS if (c1 - c0) <= b * max_columns), MONTH_BLOCKS[-1])
+        r0, c0 = r0 - r0 % by, c0 - c0 % bx
+        r1, c1 = r0 + -(-(r1 - r0) // by) * by, c0 + -(-(c1 - c0) // bx) * bx
+
+        block = np.full((r1 - r0, c1 - c0), np.nan, dtype=np.float32)
+        source = self.values[MEASURES.index(measure), r0:r1, c0:c1]
+        block[:source.shape[0], :source.shape[1]] = source
+        block = block.reshape((r1 - r0) // by, by, (c1 - c0) // bx, bx)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # Blöcke ganz ohne Werte
+            z = np.nanmean(block, axis=(1, 3))
+        return {'z': z, 'rows': (r0, r1, by), 'columns': (c0, c1, bx)}
+
+
+def _clip(span, size):
+    if span is None:
+        return 0, size
+    low, high = sorted(span)
+    low = min(max(int(np.floor(low + 0.5)), 0), size - 1)
+    high = min(max(int(np.ceil(high + 0.5)), low + 1), size)
+    return low, high
+
+
+_loaded = (None, None)
+_lock = threading.Lock()
+
+
+def version():
+    return data_store.data_version(TABLES) + data_access.backend().version()
+
+
+def matrix():
+    # Einmal je Datenversion aufbauen, aus den Detaildaten falls vorhanden
+    global _loaded
+    current = version()
+    with _lock:
+        if _loaded[0] != current:
+            try:
+                result = CountryMonths.from_detail(data_access.backend().country_months())
+            except data_access.DetailUnavailable:
+                result = CountryMonths.estimate(data_store.get_table('df_grouped'),
+                                                data_store.get_table('gesamt_deutschland_monthly'))
+            _loaded = (current, result)
+        return _loaded[1]
@@ -0,0 +1,119 @@
+import gzip
+import hashlib
+import os
+import threading
+
+import flask
+
+import instrumentation
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ETags, Cache-Control und Kompression für die Antworten des Flask-Servers.
+# GET-Antworten (Layout, Abhängigkeiten, /figure-*) bekommen ein schwaches
+# ETag aus ihrem Inhalt; schickt der Browser es als If-None-Match zurück,
+# antwortet der Server mit 304 ohne Inhalt. Statische Dateien bringen ihr
+# ETag von Flask mit. Callback-Antworten (POST _dash-update-component) werden
+# nur komprimiert: dash-renderer schickt dort kein If-None-Match und wertet
+# alles außer 200/204 als Fehler. JSON-, Text-, JS- und CSS-Antworten werden
+# mit brotli (falls installiert) oder gzip komprimiert. Die gesparten Bytes
+# stehen als dash_http_saved_bytes unter /metrics.
+
+GET_CACHE_CONTROL = os.environ.get('HTTP_CACHE_CONTROL', 'no-cache')
+ASSETS_CACHE_CONTROL = os.environ.get('HTTP_CACHE_CONTROL_ASSETS', 'public, max-age=3600')
+# Kleinere Antworten werden nicht komprimiert, 0 = Kompression aus
+MIN_SIZE = int(os.environ.get('HTTP_COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE = {'application/json', 'application/javascript', 'text/javascript', 'text/css',
+                'text/html', 'text/plain', 'image/svg+xml'}
+
+# (Pfad, ETag der Datei, Kodierung) -> komprimierter Inhalt statischer Dateien
+_compressed = {}
+_lock = threading.Lock()
+
+
+def content_etag(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _conditional(response):
+    # Schwaches ETag, weil die komprimierte Antwort andere Bytes hat
+    data = response.get_data()
+    response.set_etag(content_etag(data), weak=True)
+    response.headers['Cache-Control'] = GET_CACHE_CONTROL
+    response.make_conditional(flask.request)
+    if response.status_code == 304:
+        instrumentation.observe('dash_http_saved_bytes', {'kind': 'get', 'reason': 'not_modified'},
+                                len(data), instrumentation.BYTES_BUCKETS)
+
+
+def choose_encoding(accept_encodings):
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def _compress_response(response, kind):
+    if (MIN_SIZE <= 0 or response.status_code != 200 or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE):
+        return
+    encoding = choose_encoding(flask.request.accept_encodings)
+    response.vary.add('Accept-Encoding')
+    if encoding is None:
+        return
+    response.direct_passthrough = False  # Dateien von send_file einlesen
+    data = response.get_data()
+    if len(data) < MIN_SIZE:
+        return
+    file_etag = response.get_etag()[0] if kind == 'assets' else None
+    key = (flask.request.path, file_etag, encoding)
+    body = _compressed.get(key) if file_etag else None
+    if body is None:
+        body = compress(data, encoding)
+        if file_etag:
+            with _lock:
+                _compressed[key] = body
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if file_etag:
+        # Wie nginx: komprimiert ist die Datei nur noch schwach gleich
+        response.set_etag(file_etag, weak=True)
+    instrumentation.observe('dash_http_saved_bytes', {'kind': kind, 'reason': 'compression'},
+                            len(data) - len(body), instrumentation.BYTES_BUCKETS)
+
+
+def install(app):
+    server = app.server
+    prefix = app.config.requests_pathname_prefix
+    dispatch_path = prefix + '_dash-update-component'
+    conditional_paths = {prefix + '_dash-layout', prefix + '_dash-dependencies', '/figure-cache', '/figure-payload'}
+    assets_prefixes = (prefix + 'assets/', prefix + '_dash-component-suites/')
+
+    @server.after_request
+    def cache_headers(response):
+        path = flask.request.path
+        if path == dispatch_path:
+            _compress_response(response, 'callback')
+        elif path.startswith(assets_prefixes):
+            if path.startswith(assets_prefixes[0]) and response.status_code in (200, 304):
+                response.headers['Cache-Control'] = ASSETS_CACHE_CONTROL
+            _compress_response(response, 'assets')
+        else:
+            if (path in conditional_paths and flask.request.method == 'GET'
+                    and response.status_code == 200):
+                _conditional(response)
+            _compress_response(response, 'other')
+        return response
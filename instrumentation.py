@@ -0,0 +1,201 @@
+import bisect
+import contextlib
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+import flask
+
+logger = logging.getLogger(__name__)
+
+# Laufzeit und Antwortgröße jedes Dash-Callbacks, je Callback und Route als
+# Histogramme im Prometheus-Textformat unter /metrics. Die Laufzeit wird in
+# Phasen zerlegt: slicing (Daten auswählen, per phase('slicing') markiert),
+# building (restliche Zeit im Callback) und serialization (JSON für den
+# Browser, inklusive der Verarbeitung durch Dash).
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1_000, 4_000, 16_000, 64_000, 256_000, 1_000_000, 4_000_000, 16_000_000)
+PHASES = ['slicing', 'building', 'serialization', 'total']
+
+# Langsame Anfragen mit cProfile-Auszug protokollieren, z. B. CALLBACK_SLOW_MS=200
+SLOW_MS = float(os.environ['CALLBACK_SLOW_MS']) if os.environ.get('CALLBACK_SLOW_MS') else None
+PROFILE_DIR = os.environ.get('CALLBACK_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'dash-slow'))
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # letzter Eintrag: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+# (Metrik, Labels) -> Histogram
+_histograms = {}
+_lock = threading.Lock()
+
+
+def observe(metric, labels, value, buckets=SECONDS_BUCKETS):
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def _format_labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in items) + '}'
+
+
+def render():
+    with _lock:
+        items = sorted(_histograms.items())
+        lines = []
+        seen = set()
+        for (metric, labels), histogram in items:
+            if metric not in seen:
+                lines.append(f'# TYPE {metric} histogram')
+                seen.add(metric)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{_format_labels(labels, le=bound)} {cumulative}')
+            lines.append(f'{metric}_sum{_format_labels(labels)} {histogram.sum:.6f}')
+            lines.append(f'{metric}_count{_format_labels(labels)} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+@contextlib.contextmanager
+def phase(name):
+    # Markiert einen Abschnitt im Callback; außerhalb einer Anfrage (z. B.
+    # beim Vorwärmen des Caches) wird nichts gemessen
+    if not flask.has_request_context() or 'callback_phases' not in flask.g:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = flask.g.callback_phases
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def _timed(func):
+    # Zeit im Callback selbst; die Antwort baut Dash danach
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if flask.has_request_context() and 'callback_phases' in flask.g:
+            flask.g.callback_name = func.__name__
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if flask.has_request_context() and 'callback_phases' in flask.g:
+                flask.g.callback_seconds = time.perf_counter() - start
+    return wrapper
+
+
+def _pathname(body, routes):
+    # Route aus dem url-Input des Callbacks, sonst aus der aufrufenden Seite
+    pathname = None
+    for item in body.get('inputs', []):
+        if isinstance(item, dict) and item.get('id') == 'url' and item.get('property') == 'pathname':
+            pathname = item.get('value')
+    if pathname is None and flask.request.referrer:
+        pathname = urlparse(flask.request.referrer).path
+    # Unbekannte Pfade zusammenfassen, damit die Zahl der Labels begrenzt bleibt
+    return pathname if pathname in routes else 'andere'
+
+
+def _dump_profile(profiler, name, seconds):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f'{time.strftime("%Y%m%d-%H%M%S")}-{name}-{seconds * 1e3:.0f}ms.prof')
+    profiler.dump_stats(path)
+    return path
+
+
+def instrument(app, routes=()):
+    # Vor dem Registrieren der Callbacks aufrufen: jede mit app.callback
+    # registrierte Funktion wird gemessen
+    routes = set(routes)
+    server = app.server
+    dispatch_path = app.config.requests_pathname_prefix + '_dash-update-component'
+    register = app.callback
+
+    @functools.wraps(register)
+    def callback(*args, **kwargs):
+        decorator = register(*args, **kwargs)
+        return lambda func: decorator(_timed(func))
+    app.callback = callback
+
+    @server.before_request
+    def start_timer():
+        if flask.request.path != dispatch_path:
+            return
+        flask.g.callback_phases = {}
+        flask.g.callback_start = time.perf_counter()
+        if SLOW_MS is not None:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                flask.g.callback_profiler = profiler
+            except ValueError:
+                # Es läuft bereits ein anderer Profiler
+                pass
+
+    @server.after_request
+    def record(response):
+        if 'callback_start' not in flask.g:
+            return response
+        total = time.perf_counter() - flask.g.callback_start
+        profiler = flask.g.pop('callback_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+
+        name = flask.g.get('callback_name', 'unbekannt')
+        labels = {'callback': name, 'pathname': _pathname(flask.request.get_json(silent=True) or {}, routes)}
+        phases = flask.g.callback_phases
+        inside = flask.g.get('callback_seconds', total)
+        slicing = phases.get('slicing', 0.0)
+        serialization = phases.get('serialization', 0.0) + max(total - inside, 0.0)
+        building = max(inside - slicing - phases.get('serialization', 0.0), 0.0)
+        for phase_name, seconds in zip(PHASES, [slicing, building, serialization, total]):
+            observe('dash_callback_seconds', {**labels, 'phase': phase_name}, seconds)
+        size = response.calculate_content_length()
+        if size is not None:
+            observe('dash_callback_response_bytes', labels, size, BYTES_BUCKETS)
+
+        if profiler is not None and total * 1e3 >= SLOW_MS:
+            path = _dump_profile(profiler, name, total)
+            # Funktionen mit der größten Eigenzeit
+            top = sorted(pstats.Stats(profiler).stats.items(), key=lambda item: item[1][2], reverse=True)[:5]
+            logger.warning('Langsamer Callback %s (%s): %.1f ms, davon slicing %.1f, building %.1f, '
+                           'serialization %.1f ms; Profil: %s; teuerste Funktionen: %s',
+                           name, labels['pathname'], total * 1e3, slicing * 1e3, building * 1e3,
+                           serialization * 1e3, path,
+                           ', '.join(f'{func[2]} ({stats[2] * 1e3:.1f} ms)' for func, stats in top))
+        return response
+
+    @server.route('/metrics')
+    def metrics():
+        return flask.Response(render(), mimetype='text/plain; version=0.0.4')
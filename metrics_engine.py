@@ -0,0 +1,123 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_store
+
+# Leitet die Kennzahlen von df_grouped aus den reinen Jahreswerten je Land
+# ab: Handelsvolumen, Handelsbilanz, Rankings je Jahr, Wachstum und
+# Differenz zum Vorjahr sowie Rankings des Wachstums. Dieselbe Rechnung
+# liefert die Kennzahlen je Ware für aggregated_df/df_reduced.
+
+KENNZAHLEN = ['export', 'import', 'handelsvolumen']
+
+# Spaltenreihenfolge wie in data/df_grouped.csv
+COLUMNS = (
+    ['Jahr', 'export_wert', 'import_wert', 'handelsvolumen_wert', 'handelsbilanz', 'handelsbilanz_status']
+    + [f'{k}_ranking' for k in KENNZAHLEN]
+    + [f'{k}_wachstum' for k in KENNZAHLEN]
+    + [f'{k}_wachstum_ranking' for k in KENNZAHLEN]
+    + [f'{k}_differenz' for k in KENNZAHLEN]
+)
+
+# Spaltennamen der Warentabellen
+GOODS_COLUMNS = {'Ausfuhr: Wert': 'export_wert', 'Einfuhr: Wert': 'import_wert'}
+
+
+def _rank(values, jahre):
+    # Ranking je Jahr, größter Wert = Platz 1, Gleichstand bekommt den
+    # mittleren Platz (z. B. 131.5), NaN bleibt ohne Platz
+    return pd.Series(values).groupby(jahre).rank(method='average', ascending=False).to_numpy()
+
+
+def derive_metrics(raw, key='Land'):
+    # raw: eine Zeile je key und Jahr mit export_wert und import_wert
+    df = raw.sort_values([key, 'Jahr'], kind='stable').reset_index(drop=True)
+    keys = df[key].to_numpy()
+    jahre = df['Jahr'].to_numpy()
+    export = df['export_wert'].to_numpy(dtype=np.int64)
+    import_ = df['import_wert'].to_numpy(dtype=np.int64)
+
+    result = {key: df[key], 'Jahr': df['Jahr']}
+    result['export_wert'] = export
+    result['import_wert'] = import_
+    result['handelsvolumen_wert'] = export + import_
+    result['handelsbilanz'] = export - import_
+    result['handelsbilanz_status'] = np.where(result['handelsbilanz'] > 0, 'Überschuss', 'Defizit')
+
+    # Vorjahreszeile: direkt davor, gleicher Schlüssel und genau ein Jahr früher
+    has_prev = np.zeros(len(df), dtype=bool)
+    has_prev[1:] = (keys[1:] == keys[:-1]) & (jahre[1:] == jahre[:-1] + 1)
+    prev_index = np.arange(len(df)) - 1
+
+    for k in KENNZAHLEN:
+        values = result[f'{k}_wert'].astype('float64')
+        prev = np.where(has_prev, values[prev_index], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            wachstum = (values - prev) / prev * 100
+        # Ohne Vorjahr (erstes Jahr) sind Wachstum und Differenz 0
+        wachstum[~has_prev] = 0.0
+        result[f'{k}_ranking'] = _rank(values, jahre)
+        result[f'{k}_wachstum'] = wachstum
+        result[f'{k}_wachstum_ranking'] = _rank(wachstum, jahre)
+        result[f'{k}_differenz'] = np.where(has_prev, values - prev, 0.0)
+
+    return pd.DataFrame(result, columns=[key] + COLUMNS)
+
+
+def reduce_goods(aggregated_df, key='Label'):
+    # Monatswerte je Ware zu Jahreswerten wie in df_reduced
+    return (aggregated_df.groupby(['Jahr', key], observed=True, sort=True)[list(GOODS_COLUMNS)]
+            .sum().reset_index())
+
+
+def goods_metrics(df, key='Label'):
+    # Kennzahlen je Ware; df mit Jahreswerten (df_reduced) oder Monatswerten (aggregated_df)
+    if 'Monat' in df.columns:
+        df = reduce_goods(df, key)
+    raw = df[[key, 'Jahr', *GOODS_COLUMNS]].rename(columns=GOODS_COLUMNS)
+    raw[key] = raw[key].astype(str)
+    return derive_metrics(raw, key)
+
+
+def check_against_shipped():
+    # Vergleicht die abgeleiteten Spalten mit data/df_grouped.csv
+    shipped = data_store.read_csv('df_grouped')
+    raw = shipped[['Land', 'Jahr', 'export_wert', 'import_wert']].copy()
+    raw['Land'] = raw['Land'].astype(str)
+
+    start = time.perf_counter()
+    derived = derive_metrics(raw)
+    seconds = time.perf_counter() - start
+
+    shipped = shipped.assign(Land=shipped['Land'].astype(str)).sort_values(['Land', 'Jahr'], kind='stable').reset_index(drop=True)
+    mismatches = []
+    for col in COLUMNS:
+        expected = shipped[col].to_numpy()
+        actual = derived[col].to_numpy()
+        if expected.dtype.kind == 'f':
+            same = np.allclose(actual, expected, rtol=1e-6, equal_nan=True)
+        else:
+            same = np.array_equal(actual.astype(str), expected.astype(str))
+        if not same:
+            mismatches.append(col)
+    return mismatches, seconds
+
+
+if __name__ == '__main__':
+    mismatches, seconds = check_against_shipped()
+    print(f'df_grouped aus Rohwerten abgeleitet in {seconds * 1e3:.1f} ms')
+    if mismatches:
+        raise SystemExit(f'Abweichungen zu data/df_grouped.csv in: {", ".join(mismatches)}')
+    print('Alle Spalten stimmen mit data/df_grouped.csv überein')
+
+    start = time.perf_counter()
+    goods = goods_metrics(data_store.read_csv('aggregated_df'))
+    print(f'Warenkennzahlen aus aggregated_df in {(time.perf_counter() - start) * 1e3:.1f} ms ({len(goods)} Zeilen)')
+    reduced = data_store.read_csv('df_reduced')
+    expected = reduced.assign(Label=reduced['Label'].astype(str)).sort_values(['Jahr', 'Label']).reset_index(drop=True)
+    actual = reduce_goods(data_store.read_csv('aggregated_df')).astype({'Label': str})
+    same = np.array_equal(actual[list(GOODS_COLUMNS)].to_numpy(), expected[list(GOODS_COLUMNS)].to_numpy())
+    print('df_reduced stimmt mit den Jahressummen aus aggregated_df überein' if same
+          else 'df_reduced weicht von den Jahressummen aus aggregated_df ab')
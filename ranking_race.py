@@ -0,0 +1,65 @@
+import base64
+
+import numpy as np
+
+import top_n
+
+# Bar-Race der Export- und Importrankings über alle Jahre. Die Frames werden
+# einmal je Snapshot aus dem TopNIndex berechnet und auf die sichtbaren
+# Top N begrenzt. Jeder Frame enthält nur die Balken, die gegenüber dem
+# Vorjahr neu sind oder sich geändert haben, sowie die ausgeschiedenen;
+# Länder-IDs, Werte (Tausend €) und Plätze als base64-kodierte Typed Arrays.
+# Abgespielt wird komplett im Browser (assets/ranking_race.js).
+
+RACE_N = 15
+
+# Rangliste -> Spalte mit der Balkenlänge
+RACES = {
+    'export_ranking': 'export_wert',
+    'import_ranking': 'import_wert',
+}
+
+
+def _typed(values, dtype):
+    # Little Endian wie Typed Arrays im Browser
+    return base64.b64encode(np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<')).tobytes()).decode()
+
+
+class RankingRace:
+
+    def __init__(self, df, n=RACE_N, races=RACES):
+        index = top_n.TopNIndex(df, metrics=list(races))
+        self.n = n
+        self.years = [int(jahr) for jahr in index.years]
+        countries = index.df['Land'].to_numpy(dtype=object)
+
+        # Nur Länder, die in mindestens einem Frame sichtbar sind
+        top_rows = {metric: [index.rows(jahr, metric, n, ascending=True) for jahr in self.years] for metric in races}
+        self.countries = sorted({countries[row] for rows in top_rows.values() for year_rows in rows for row in year_rows})
+        country_id = {land: i for i, land in enumerate(self.countries)}
+
+        self.races = {}
+        for metric, value_column in races.items():
+            ranks = index.df[metric].to_numpy(dtype='float32')
+            # Werte in Tausend €: die Quelldaten sind ganze Tausender, als
+            # uint32 exakt, float32 verlöre bei 1e11 € bis zu einige Tausend €
+            values = np.rint(index.df[value_column].to_numpy(dtype='float64') / 1000).astype(np.uint32)
+            frames, previous = [], {}
+            for rows in top_rows[metric]:
+                current = {country_id[countries[row]]: (values[row], ranks[row]) for row in rows}
+                changed = sorted(i for i, bar in current.items() if previous.get(i) != bar)
+                removed = sorted(set(previous) - set(current))
+                frames.append({
+                    'removed': _typed(removed, 'int16'),
+                    'ids': _typed(changed, 'int16'),
+                    'values': _typed([current[i][0] for i in changed], 'uint32'),
+                    'ranks': _typed([current[i][1] for i in changed], 'float32'),
+                })
+                previous = current
+            self.races[metric] = {
+                'frames': frames,
+                'max': float(values[np.concatenate(top_rows[metric])].max()) * 1000 if self.years else 0.0,
+            }
+
+    def payload(self):
+        return {'n': self.n, 'years': self.years, 'countries': self.countries, 'races': self.races}
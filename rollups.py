@@ -0,0 +1,125 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Wertspalten aus aggregated_df
+MEASURES = ['Ausfuhr: Wert', 'Einfuhr: Wert', 'Handelsvolumen']
+
+
+class TimeRollup:
+    # Monatswerte aus aggregated_df als dichtes Array Code × Jahr × Monat ×
+    # Wert, daraus vorberechnet Jahres- und Quartalssummen je WA-Code sowie
+    # Gesamtsummen über alle Waren. Neue Monate werden mit append()
+    # eingespielt; neu berechnet werden dabei nur die betroffenen Jahre.
+
+    def __init__(self, df, measures=MEASURES):
+        self.measures = list(measures)
+        self.measure_index = {m: i for i, m in enumerate(self.measures)}
+        self.codes = np.empty(0, dtype=object)
+        self.labels = np.empty(0, dtype=object)
+        self.code_index = {}
+        self.years = np.empty(0, dtype=np.int16)
+        self.monthly = np.zeros((0, 0, 12, len(self.measures)), dtype=np.int64)
+        # Jahr × Monat: ist der Monat in den Daten enthalten?
+        self.months_present = np.zeros((0, 12), dtype=bool)
+        self.yearly = np.zeros((0, 0, len(self.measures)), dtype=np.int64)
+        self.quarterly = np.zeros((0, 0, 4, len(self.measures)), dtype=np.int64)
+        self.totals_yearly = np.zeros((0, len(self.measures)), dtype=np.int64)
+        self.totals_quarterly = np.zeros((0, 4, len(self.measures)), dtype=np.int64)
+        self.append(df)
+
+    def _grow(self, codes, labels, years):
+        # Neue Codes und Jahre an die Achsen anhängen; bestehende Werte bleiben
+        new_codes = [c for c in pd.unique(codes) if c not in self.code_index]
+        if new_codes:
+            label_of = dict(zip(codes, labels))
+            self.codes = np.append(self.codes, np.array(new_codes, dtype=object))
+            self.labels = np.append(self.labels, np.array([label_of[c] for c in new_codes], dtype=object))
+            self.code_index = {code: i for i, code in enumerate(self.codes)}
+
+        low = min(years.min(), self.years[0]) if len(self.years) else years.min()
+        high = max(years.max(), self.years[-1]) if len(self.years) else years.max()
+        before = int(self.years[0] - low) if len(self.years) else 0
+        after = int(high - low + 1) - before - len(self.years)
+        self.years = np.arange(low, high + 1, dtype=np.int16)
+
+        pad_codes = len(self.codes) - self.monthly.shape[0]
+        self.monthly = np.pad(self.monthly, ((0, pad_codes), (before, after), (0, 0), (0, 0)))
+        self.months_present = np.pad(self.months_present, ((before, after), (0, 0)))
+        self.yearly = np.pad(self.yearly, ((0, pad_codes), (before, after), (0, 0)))
+        self.quarterly = np.pad(self.quarterly, ((0, pad_codes), (before, after), (0, 0), (0, 0)))
+        self.totals_yearly = np.pad(self.totals_yearly, ((before, after), (0, 0)))
+        self.totals_quarterly = np.pad(self.totals_quarterly, ((before, after), (0, 0), (0, 0)))
+
+    def append(self, df):
+        if df.empty:
+            return
+        codes = df['Code'].to_numpy(dtype=object)
+        jahre = df['Jahr'].to_numpy()
+        self._grow(codes, df['Label'].to_numpy(dtype=object), jahre)
+
+        ci, yi, mi = self._cells(df)
+        # Zuweisen statt Addieren: ein erneut gelieferter Monat ersetzt den alten Wert
+        self.monthly[ci, yi, mi] = df[self.measures].to_numpy(dtype=np.int64)
+        self.months_present[yi, mi] = True
+
+        # Nur die Jahre neu aggregieren, in denen sich etwas geändert hat
+        touched = np.unique(yi)
+        months = self.monthly[:, touched]
+        self.quarterly[:, touched] = months.reshape(months.shape[0], len(touched), 4, 3, -1).sum(axis=3)
+        self.yearly[:, touched] = months.sum(axis=2)
+        self.totals_quarterly[touched] = self.quarterly[:, touched].sum(axis=0)
+        self.totals_yearly[touched] = self.yearly[:, touched].sum(axis=0)
+
+    def _cells(self, df):
+        # Position je Zeile im Array; -1 für Codes oder Jahre, die fehlen
+        codes = df['Code'].astype('category')
+        ci = pd.Index(self.codes).get_indexer(codes.cat.categories)[codes.cat.codes.to_numpy()]
+        yi = df['Jahr'].to_numpy().astype(np.intp) - (int(self.years[0]) if len(self.years) else 0)
+        known = (ci >= 0) & (yi >= 0) & (yi < len(self.years))
+        return np.where(known, ci, -1), np.where(known, yi, -1), df['Monat'].to_numpy().astype(np.intp) - 1
+
+    def updated(self, old_df, new_df):
+        # Kopie mit dem Stand von new_df: nur neue oder geänderte Zeilen gehen
+        # durch append(). Das Original bleibt unverändert, ältere Snapshots
+        # lesen es weiter. Sind Zeilen weggefallen, None (Neuaufbau nötig).
+        ci, yi, mi = self._cells(new_df)
+        known = ci >= 0
+        values = new_df[self.measures].to_numpy(dtype=np.int64)
+        changed = ~known
+        changed[known] = (self.monthly[ci[known], yi[known], mi[known]] != values[known]).any(axis=1) | \
+            ~self.months_present[yi[known], mi[known]]
+
+        old_ci, old_yi, old_mi = self._cells(old_df)
+        covered = np.zeros(self.monthly.shape[:3], dtype=bool)
+        covered[old_ci, old_yi, old_mi] = True
+        covered[ci[known], yi[known], mi[known]] = False
+        if covered.any():
+            return None
+
+        result = copy.deepcopy(self)
+        result.append(new_df[changed])
+        return result
+
+    def year_values(self, year, measure):
+        # Jahreswerte aller Codes für eine Kennzahl; leer für Jahre außerhalb der Daten
+        mi = self.measure_index[measure]
+        if not len(self.years) or not self.years[0] <= year <= self.years[-1]:
+            return np.empty(0, dtype=self.yearly.dtype)
+        return self.yearly[:, int(year) - int(self.years[0]), mi]
+
+    def top(self, year, measure, n):
+        values = self.year_values(year, measure)
+        order = np.argsort(values, kind='stable')[::-1][:n]
+        return self.codes[order], self.labels[order], values[order]
+
+    def code_series(self, code, measure, freq='year'):
+        # Verlauf eines Codes als (Beschriftungen, Werte), jährlich oder quartalsweise
+        ci, mi = self.code_index[code], self.measure_index[measure]
+        if freq == 'year':
+            return self.years, self.yearly[ci, :, mi]
+        if freq == 'quarter':
+            labels = [f'{jahr} Q{q}' for jahr in self.years for q in range(1, 5)]
+            return labels, self.quarterly[ci, :, :, mi].ravel()
+        raise ValueError(f"Unbekannte Frequenz: {freq!r} (erwartet 'year' oder 'quarter')")
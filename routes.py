@@ -0,0 +1,132 @@
+import importlib
+import threading
+from urllib.parse import urlparse
+
+import flask
+from dash import html
+
+import data_access
+import data_store
+
+# Routen aus der Navigation, je Route ein Seitenmodul unter views/ mit
+# layout(pathname) und register(app). Das Modul wird erst beim ersten Besuch
+# importiert und registriert dann seine Callbacks; die Callbacks hören nur
+# auf Komponenten der eigenen Seite statt auf url.pathname aller Seiten.
+
+# Route -> (Seitenmodul, Tabellen, die die Callbacks der Route brauchen).
+# Geladen wird erst beim ersten Zugriff (data_store.get_table), mit
+# DATA_LOADING=eager beim Start.
+PAGES = {
+    "/gesamt-export-import-handelsvolumen": ('views.gesamt_verlauf', ['gesamt_deutschland']),
+    "/monatlicher-handelsverlauf": ('views.monatlicher_verlauf', ['gesamt_deutschland_monthly']),
+    "/top-10-handelspartner": ('views.top_handelspartner', ['df_grouped']),
+    "/laender-zuwaechse-absolut": ('views.laender_zuwaechse', ['df_grouped']),
+    "/laender-zuwaechse-relativ": ('views.laender_zuwaechse', ['df_grouped']),
+    "/land-handelsverlauf": ('views.land_verlauf', ['df_grouped']),
+    "/laender-vergleich": ('views.laender_vergleich', ['df_grouped']),
+    "/land-ranking": ('views.land_ranking', ['df_grouped']),
+    # Monatswerte je Land aus den Detaildaten, sonst geschätzt aus beiden Tabellen
+    "/laender-heatmap": ('views.laender_heatmap', ['df_grouped', 'gesamt_deutschland_monthly']),
+    "/top-10-waren": ('views.top_waren', ['aggregated_df']),
+    "/waren-verlauf": ('views.waren_verlauf', ['aggregated_df']),
+    # Detaildaten Land × Ware nur über das SQL-Backend (data_access)
+    "/land-top-waren": ('views.detaildaten', ['df_grouped']),
+    "/ware-top-laender": ('views.detaildaten', ['aggregated_df']),
+    # Prognosen aus dem Cache von forecast.py, Ist-Werte aus den Tabellen
+    "/prognose": ('views.prognose', ['gesamt_deutschland_monthly', 'df_grouped', 'aggregated_df']),
+}
+ROUTE_TABLES = {pathname: tables for pathname, (_, tables) in PAGES.items()}
+
+_app = None
+_routes = []
+# Modulname -> importiertes Seitenmodul mit registrierten Callbacks
+_modules = {}
+# Route -> (Datenversion, Layout)
+_layouts = {}
+_lock = threading.Lock()
+
+
+# Datenversion einer Route für den Figure- und Layout-Cache
+def route_version(pathname):
+    return data_store.data_version(ROUTE_TABLES.get(pathname, [])) + data_access.backend().version()
+
+
+def nav_routes(nav):
+    # Links der Navigation in Reihenfolge; "#" sind noch nicht umgesetzte Seiten
+    for value in nav.values():
+        if isinstance(value, dict):
+            yield from nav_routes(value)
+        elif value != '#':
+            yield value
+
+
+def routes():
+    return list(_routes)
+
+
+def load(pathname):
+    module_name = PAGES[pathname][0]
+    with _lock:
+        module = _modules.get(module_name)
+        if module is None:
+            module = importlib.import_module(module_name)
+            if hasattr(module, 'register'):
+                module.register(_app)
+            _modules[module_name] = module
+    return module
+
+
+def start_page():
+    return html.Div([
+        html.H1("Deutschlands Außenhandel"),
+        html.P("Bitte links in der Navigation eine Seite auswählen.")
+    ])
+
+
+def layout(pathname):
+    if pathname not in _routes:
+        return start_page()
+    version = route_version(pathname)
+    cached = _layouts.get(pathname)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    content = load(pathname).layout(pathname)
+    _layouts[pathname] = (version, content)
+    return content
+
+
+def clear_layouts():
+    _layouts.clear()
+
+
+def _requested_route():
+    # Seitenaufruf direkt, Dash-Anfragen (_dash-dependencies,
+    # _dash-update-component) über die aufrufende Seite
+    path = flask.request.path
+    if path.startswith(_app.config.requests_pathname_prefix + '_dash-') and flask.request.referrer:
+        path = urlparse(flask.request.referrer).path
+    return path
+
+
+def install(app, nav):
+    # Nach instrumentation.instrument aufrufen, damit auch die Callbacks der
+    # Seitenmodule gemessen werden
+    global _app, _routes
+    _app = app
+    _routes = [pathname for pathname in nav_routes(nav) if pathname in PAGES]
+
+    # Callbacks der Seite registrieren, bevor der Browser die Abhängigkeiten
+    # abfragt. Jeder Worker lädt die Seite beim ersten eigenen Zugriff.
+    @app.server.before_request
+    def load_requested_page():
+        pathname = _requested_route()
+        if pathname in _routes:
+            load(pathname)
+
+
+def warm_figure_cache(years):
+    # Figuren aller Seiten mit Jahresauswahl vorab berechnen
+    for pathname in _routes:
+        for func in getattr(load(pathname), 'YEAR_FIGURES', []):
+            for year in years:
+                func(pathname, int(year))
@@ -2,33 +2,41 @@ import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output
 import dash_bootstrap_components as dbc
-import pandas as pd
-import plotly.graph_objects as go
-import numpy as np
-import math
+import os
 
-# CSV-Dateien laden
-df_gesamt_deutschland = pd.read_csv('data/1gesamt_deutschland.csv')
-df_gesamt_deutschland_monthly = pd.read_csv('data/gesamt_deutschland_monthly.csv')
-df_grouped = pd.read_csv('data/df_grouped.csv')
-aggregated_df = pd.read_csv('data/aggregated_df.csv')
-df_reduced = pd.read_csv('data/df_reduced.csv')
+import data_store
+import figure_cache
+import figure_patch
+import http_cache
+import instrumentation
+import routes
 
-# Funktion zur Formatierung der Y-Achse für den monatlichen Graphen
-def formatter(value):
-    if value >= 1e9:
-        return f'{value / 1e9:.0f} Mrd'
-    elif value >= 1e6:
-        return f'{value / 1e6:.0f} Mio'
-    elif value >= 1e3:
-        return f'{value / 1e3:.0f} K'
-    else:
-        return str(value)
+data_store.warm_up(sorted({name for names in routes.ROUTE_TABLES.values() for name in names}))
+
+# data/ im Hintergrund beobachten und geänderte CSVs als neuen Snapshot eintauschen
+data_store.start_watcher()
 
 # Dash-App erstellen
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
 server = app.server
 
+# ETags für GET-Antworten, Cache-Control und Kompression
+http_cache.install(app)
+
+# Laufzeit und Antwortgröße aller Callbacks unter /metrics, vor den Callbacks registrieren
+instrumentation.instrument(app, routes.ROUTE_TABLES)
+
+
+@server.route('/figure-cache')
+def figure_cache_stats():
+    return figure_cache.stats()
+
+
+# Gesendete Bytes je Callback, mit ganzer Figure und mit Patch
+@server.route('/figure-payload')
+def figure_payload_stats():
+    return figure_patch.payload_stats()
+
 # Kategorien und Subkategorien mit Links für zukünftige Navigation
 def create_nav_structure():
     return {
@@ -39,20 +47,21 @@ def create_nav_structure():
             "Überblick nach bestimmtem Jahr": {
                 "Monatlicher Handelsverlauf": "/monatlicher-handelsverlauf",
                 "Top 10 Handelspartner": "/top-10-handelspartner",
-                "Länder mit größten Export- und Importzuwächsen (absolut)": "#",
-                "Länder mit größten Export- und Importzuwächsen (relativ)": "#",
-                "Top 10 Waren": "#",
+                "Länder mit größten Export- und Importzuwächsen (absolut)": "/laender-zuwaechse-absolut",
+                "Länder mit größten Export- und Importzuwächsen (relativ)": "/laender-zuwaechse-relativ",
+                "Top 10 Waren": "/top-10-waren",
                 "Waren mit größten Export- und Importzuwächsen (absolut)": "#",
                 "Waren mit größten Export- und Importzuwächsen (relativ)": "#"
             }
         },
         "Länderanalyse": {
             "Gesamtüberblick seit 2008 bis 2024": {
-                "Gesamter Export-, Import- und Handelsvolumen-Verlauf mit Deutschland": "#",
-                "Vergleich mit anderen Ländern": "#",
+                "Gesamter Export-, Import- und Handelsvolumen-Verlauf mit Deutschland": "/land-handelsverlauf",
+                "Vergleich mit anderen Ländern": "/laender-vergleich",
                 "Export- und Importwachstumsrate": "#",
-                "Platzierung im Export- und Importranking Deutschlands": "#",
-                "Deutschlands Top 10 Waren im Handel": "#"
+                "Platzierung im Export- und Importranking Deutschlands": "/land-ranking",
+                "Handel mit allen Ländern je Monat (Heatmap)": "/laender-heatmap",
+                "Deutschlands Top 10 Waren im Handel": "/land-top-waren"
             },
             "Überblick nach bestimmtem Jahr": {
                 "Handelsbilanz & Ranking": "#",
@@ -64,9 +73,12 @@ def create_nav_structure():
         },
         "Warenanalyse": {
             "Gesamtüberblick seit 2008 bis 2024": {
-                "Gesamter Export- und Importverlauf der Ware": "#",
-                "Deutschlands Top 5 Export- und Importländer der Ware": "#"
+                "Gesamter Export- und Importverlauf der Ware": "/waren-verlauf",
+                "Deutschlands Top 5 Export- und Importländer der Ware": "/ware-top-laender"
             }
+        },
+        "Prognose": {
+            "Export- und Importprognose für 12 bis 24 Monate": "/prognose"
         }
     }
 
@@ -111,166 +123,14 @@ app.layout = html.Div([
     dbc.Container([
         dbc.Row([
             dbc.Col(sidebar, width=3),
-            dbc.Col(html.Div(id='content')),
-                html.H1("Graph wird hier angezeigt"),
-                dcc.Dropdown(
-                    id='jahr_dropdown',
-                    options=[{'label': str(j), 'value': j} for j in sorted(df_gesamt_deutschland_monthly['Jahr'].unique())],
-                    value=2024,  # Standardwert
-                    clearable=False,
-                    style={'width': '50%'}
-                ),
-                dcc.Graph(id='handel_graph')  # Der Graph wird hier angezeigt
-                dcc.Graph(id='export_graph', style={'display': 'none'}),  # Neu hinzugefügt
-                dcc.Graph(id='import_graph', style={'display': 'none'}),  # Neu hinzugefügt
-                dcc.Graph(id='handelsvolumen_graph', style={'display': 'none'})  # Neu hinzugefügt
-            ]), width=9)
+            dbc.Col(html.Div(id='content'), width=9)
         ])
+    ])
+])
 
 
-# Callback, um den Graphen für „Gesamter Export-, Import- und Handelsvolumen-Verlauf Deutschlands“ anzuzeigen
-@app.callback(
-    Output('handel_graph', 'figure'),
-    [Input('url', 'pathname'), Input('jahr_dropdown', 'value')]
-)
-def update_graph(pathname, year_selected):
-    if pathname == "/gesamt-export-import-handelsvolumen":
-        fig = go.Figure()
-
-        # Linien für Export, Import und Handelsvolumen
-        for col, name, color in zip(
-            ['gesamt_export', 'gesamt_import', 'gesamt_handelsvolumen'],
-            ['Exportvolumen', 'Importvolumen', 'Gesamthandelsvolumen'],
-            ['#1f77b4', '#ff7f0e', '#2ca02c']
-        ):
-            fig.add_trace(go.Scatter(
-                x=df_gesamt_deutschland['Jahr'],
-                y=df_gesamt_deutschland[col],
-                mode='lines+markers',
-                name=name,
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{name}</b><br>Jahr: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
-        # Berechnung der maximalen Y-Achse für Tick-Werte
-        max_value = df_gesamt_deutschland[['gesamt_export', 'gesamt_import', 'gesamt_handelsvolumen']].values.max()
-        tick_step = 500e9  # 500 Mrd als Schrittgröße
-        tickvals = np.arange(0, max_value + tick_step, tick_step)
-
-        # Layout-Anpassungen
-        fig.update_layout(
-            title='Entwicklung von Export, Import und Handelsvolumen',
-            xaxis_title='Jahr',
-            yaxis_title='Wert in €',
-            yaxis=dict(
-                tickformat=',',
-                tickvals=tickvals,
-                ticktext=[f"{val/1e9:.0f} Mrd" for val in tickvals]
-            ),
-            legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
-        )
-
-        return fig
-
-    # Callback für den monatlichen Handelsverlauf
-    elif pathname == "/monatlicher-handelsverlauf":
-        df_year_monthly = df_gesamt_deutschland_monthly[df_gesamt_deutschland_monthly['Jahr'] == year_selected]
-
-        fig = go.Figure()
-
-        for col, name, color in zip(
-            ['export_wert', 'import_wert', 'handelsvolumen_wert'],
-            ['Exportvolumen', 'Importvolumen', 'Gesamthandelsvolumen'],
-            ['#1f77b4', '#ff7f0e', '#2ca02c']
-        ):
-            fig.add_trace(go.Scatter(
-                x=df_year_monthly['Monat'],
-                y=df_year_monthly[col],
-                mode='lines+markers',
-                name=name,
-                line=dict(width=2, color=color),
-                hovertemplate=f'<b>{name}</b><br>Monat: %{{x}}<br>Wert: %{{y:,.0f}} €<extra></extra>'
-            ))
-
-        # Maximale Werte bestimmen
-        max_value = df_year_monthly[['export_wert', 'import_wert', 'handelsvolumen_wert']].values.max()
-
-        # Auf nächste 50 Mrd aufrunden
-        rounded_max = math.ceil(max_value / 50e9) * 50e9
-
-        # Y-Achse in 25-Mrd-Schritten skalieren
-        tickvals = np.arange(0, rounded_max + 1, 25e9)
-        ticktext = [formatter(val) for val in tickvals]
-
-        # Layout für den Graphen
-        fig.update_layout(
-            title=f'Monatlicher Export-, Import- und Handelsverlauf Deutschlands im Jahr {year_selected}',
-            xaxis_title='Monat',
-            yaxis_title='Wert in €',
-            xaxis=dict(
-                tickmode='array',
-                tickvals=list(range(1, 13)),
-                ticktext=['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
-            ),
-            yaxis=dict(
-                tickvals=tickvals,
-                ticktext=ticktext
-            ),
-            legend=dict(title='Kategorie', bgcolor='rgba(255,255,255,0.7)')
-        )
-
-        return fig
-
-
-    @app.callback(
-    [Output('export_graph', 'figure'),
-     Output('import_graph', 'figure'),
-     Output('handelsvolumen_graph', 'figure')],
-    [Input('url', 'pathname'), Input('jahr_dropdown', 'value')]
-)
-def update_top_10_graphs(pathname, year_selected):
-    if pathname == "/top-10-handelspartner":
-        top_10_export = df_grouped[(df_grouped['export_ranking'] <= 10) & (df_grouped['Jahr'] == year_selected)][["Land", "export_wert"]]
-        top_10_import = df_grouped[(df_grouped['import_ranking'] <= 10) & (df_grouped['Jahr'] == year_selected)][["Land", "import_wert"]]
-        top_10_trade_volume = df_grouped[(df_grouped['trade_volume_ranking'] <= 10) & (df_grouped['Jahr'] == year_selected)][["Land", "handelsvolumen_wert"]]
-
-        # Export-Graph
-        fig_export = go.Figure()
-        fig_export.add_trace(go.Bar(
-            x=top_10_export['Land'],
-            y=top_10_export['export_wert'],
-            marker=dict(color='#1f77b4'),
-            name="Export"
-        ))
-        fig_export.update_layout(title="Top 10 Exportländer Deutschlands", yaxis_title="Wert in €")
-
-        # Import-Graph
-        fig_import = go.Figure()
-        fig_import.add_trace(go.Bar(
-            x=top_10_import['Land'],
-            y=top_10_import['import_wert'],
-            marker=dict(color='#ff7f0e'),
-            name="Import"
-        ))
-        fig_import.update_layout(title="Top 10 Importländer Deutschlands", yaxis_title="Wert in €")
-
-        # Handelsvolumen-Graph
-        fig_trade = go.Figure()
-        fig_trade.add_trace(go.Bar(
-            x=top_10_trade_volume['Land'],
-            y=top_10_trade_volume['handelsvolumen_wert'],
-            marker=dict(color='#2ca02c'),
-            name="Handelsvolumen"
-        ))
-        fig_trade.update_layout(title="Top 10 Handelspartner nach Handelsvolumen", yaxis_title="Wert in €")
-
-        return fig_export, fig_import, fig_trade
-
-    return go.Figure(), go.Figure(), go.Figure()  # Falls die URL nicht übereinstimmt, leere Graphen zurückgeben.
-
-
-    else:
-        return {}  # Leeres Diagramm, wenn die URL nicht passt
+# Seiten registrieren ihre Callbacks selbst, sobald sie zum ersten Mal aufgerufen werden
+routes.install(app, categories)
 
 
 @app.callback(
@@ -278,24 +138,12 @@ def update_top_10_graphs(pathname, year_selected):
     Input('url', 'pathname')
 )
 def display_content(pathname):
-    if pathname == "/top-10-handelspartner":
-        return html.Div([
-            html.H1("Top 10 Handelsländer Deutschlands"),
-            dcc.Dropdown(
-                id='jahr_dropdown',
-                options=[{'label': str(j), 'value': j} for j in sorted(df_grouped['Jahr'].unique())],
-                value=2024,
-                clearable=False,
-                style={'width': '50%'}
-            ),
-            dcc.Graph(id='export_graph'),
-            dcc.Graph(id='import_graph'),
-            dcc.Graph(id='handelsvolumen_graph')
-        ])
-    return html.Div([
-        html.H1("Graph wird hier angezeigt"),
-        dcc.Graph(id='handel_graph')
-    ])
+    return routes.layout(pathname)
+
+
+# Optional alle Kombinationen aus Route und Jahr vorab berechnen
+if os.environ.get('FIGURE_CACHE_WARM') == '1':
+    routes.warm_figure_cache(sorted(data_store.get_table('gesamt_deutschland_monthly')['Jahr'].unique()))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,79 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+import data_store
+
+# Baut die SQLite-Datenbank für das SQL-Backend (data_access.SqliteBackend):
+# die fünf Tabellen aus data/ sowie optional die Detailtabelle
+# Land × Ware × Monat, die etl.py beim Verarbeiten des Rohexports füllt.
+
+DB_PATH = os.path.join(data_store.DATA_DIR, 'handel.sqlite')
+
+DETAIL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS handel_detail (
+    jahr INTEGER NOT NULL,
+    monat INTEGER NOT NULL,
+    land TEXT NOT NULL,
+    code TEXT NOT NULL,
+    ausfuhr INTEGER NOT NULL,
+    einfuhr INTEGER NOT NULL
+)
+"""
+
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS detail_land_jahr ON handel_detail (land, jahr)',
+    'CREATE INDEX IF NOT EXISTS detail_code_jahr ON handel_detail (code, jahr)',
+    'CREATE INDEX IF NOT EXISTS grouped_jahr ON df_grouped (Jahr)',
+    'CREATE INDEX IF NOT EXISTS aggregated_jahr ON aggregated_df (Jahr)',
+]
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(DETAIL_SCHEMA)
+    return conn
+
+
+def clear_detail(conn):
+    # Vor einem neuen Lauf von etl.py; Leser sehen bis zum commit() in finish() den alten Stand
+    conn.execute('DELETE FROM handel_detail')
+
+
+def append_detail(conn, chunk):
+    # chunk mit den Spalten des Rohexports (siehe etl.RAW_COLUMNS)
+    rows = zip(chunk['Jahr'].tolist(), chunk['Monat'].tolist(), chunk['Land'].tolist(),
+               chunk['Code'].tolist(), chunk['Ausfuhr: Wert'].tolist(), chunk['Einfuhr: Wert'].tolist())
+    conn.executemany('INSERT INTO handel_detail VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+
+def load_tables(conn, data_dir=data_store.DATA_DIR):
+    for name, (filename, schema) in data_store.TABLES.items():
+        df = pd.read_csv(os.path.join(data_dir, filename), usecols=list(schema))
+        df.to_sql(name, conn, if_exists='replace', index=False, chunksize=10_000)
+    # Bezeichnungen je WA-Code für die Detailabfragen
+    labels = pd.read_csv(os.path.join(data_dir, 'aggregated_df.csv'), usecols=['Code', 'Label']).drop_duplicates('Code')
+    labels.to_sql('waren', conn, if_exists='replace', index=False)
+
+
+def finish(conn):
+    for statement in INDEXES:
+        conn.execute(statement)
+    conn.execute('ANALYZE')
+    conn.commit()
+
+
+def build(path=DB_PATH, data_dir=data_store.DATA_DIR):
+    conn = connect(path)
+    try:
+        load_tables(conn, data_dir)
+        finish(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    build()
+    print(f'SQLite-Datenbank geschrieben: {DB_PATH}')
@@ -0,0 +1,26 @@
+// Graphen und Jahresauswahl der statischen Seiten (static_export.py): die
+// Figuren der Voreinstellung stehen im Script-Tag #figures, beim
+// Jahreswechsel wird die JSON-Datei des Jahres geladen.
+document.addEventListener('DOMContentLoaded', function () {
+    var draw = function (figures) {
+        Object.keys(figures).forEach(function (id) {
+            var graph = document.getElementById(id);
+            if (graph) {
+                Plotly.react(graph, figures[id].data, figures[id].layout, {responsive: true});
+            }
+        });
+    };
+    draw(JSON.parse(document.getElementById('figures').textContent));
+
+    var content = document.getElementById('content');
+    var dropdown = document.getElementById('jahr_dropdown');
+    if (!dropdown || !content.dataset.figures) {
+        return;
+    }
+    dropdown.addEventListener('change', function () {
+        var url = content.dataset.figures.replace('{jahr}', dropdown.value);
+        fetch(url)
+            .then(function (response) { return response.json(); })
+            .then(draw);
+    });
+});
@@ -0,0 +1,274 @@
+import argparse
+import functools
+import html as html_escape
+import importlib
+import os
+import shutil
+import time
+
+# Ohne Watcher-Thread exportieren; der monatliche Verlauf wird wie die
+# anderen Jahresseiten auf dem Server gerendert statt im Browser
+os.environ.setdefault('DATA_WATCH_INTERVAL', '0')
+os.environ['CLIENTSIDE_YEARS'] = '0'
+
+import plotly  # noqa: E402
+from plotly.io.json import to_json_plotly  # noqa: E402
+
+import routes  # noqa: E402
+import sidebar  # noqa: E402
+
+# Exportiert jede Route aus der Navigation als statische HTML-Seite samt
+# Sidebar (render_sidebar) und vorgerenderten Figuren. Seiten mit
+# Jahresauswahl bekommen je Jahr eine JSON-Datei mit allen Figuren; die
+# Jahresauswahl lädt sie im Browser (static_assets/static_years.js). Das
+# Ergebnis braucht nur einen statischen Webserver oder ein CDN.
+#
+#   python static_export.py --out static_site --base-url /
+#
+# Andere Auswahlfelder (Land, Ware, Kennzahl) zeigen nur die Voreinstellung.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SHIM = os.path.join(ROOT, 'static_assets', 'static_years.js')
+PLOTLY_JS = os.path.join(os.path.dirname(plotly.__file__), 'package_data', 'plotly.min.js')
+YEAR_INPUT = 'jahr_dropdown'
+
+PAGE = """<!DOCTYPE html>
+<html lang="de">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<link rel="stylesheet" href="{stylesheet}">
+<script src="{base}assets/plotly.min.js"></script>
+<script src="{base}assets/static_years.js" defer></script>
+</head>
+<body>
+<div class="container">
+<div class="row">
+<div class="col-3">{sidebar}</div>
+<div class="col-9" id="content" data-figures="{figures_url}">{content}</div>
+</div>
+</div>
+<script type="application/json" id="figures">{figures}</script>
+</body>
+</html>
+"""
+
+
+class CallbackRecorder:
+    # Ersatz für die App beim Aufruf von register(app) eines Seitenmoduls:
+    # merkt sich die Callbacks, statt sie bei Dash zu registrieren
+
+    def __init__(self):
+        self.callbacks = []
+        self.clientside = []
+
+    def callback(self, outputs, inputs, progress=None, **kwargs):
+        def decorator(func):
+            # Hintergrund-Callbacks bekommen zuerst set_progress
+            call = functools.partial(func, lambda progress: None) if progress else func
+            self.callbacks.append((_as_list(outputs), _as_list(inputs), call))
+            return func
+        return decorator
+
+    def clientside_callback(self, function, outputs, inputs, *args, **kwargs):
+        self.clientside.append((_as_list(outputs), _as_list(inputs)))
+
+
+def _as_list(items):
+    return list(items) if isinstance(items, (list, tuple)) else [items]
+
+
+def _components(component):
+    # Alle Komponenten des Layouts in Dokumentreihenfolge
+    if isinstance(component, (list, tuple)):
+        for child in component:
+            yield from _components(child)
+    elif hasattr(component, 'to_plotly_json'):
+        yield component
+        yield from _components(getattr(component, 'children', None))
+
+
+def _style(style):
+    return ';'.join(f"{''.join('-' + c.lower() if c.isupper() else c for c in key)}:{value}"
+                    for key, value in style.items())
+
+
+def _attrs(**attrs):
+    return ''.join(
+        f' {name}' if value is True else f' {name}="{html_escape.escape(str(value))}"'
+        for name, value in attrs.items() if value is not None and value is not False
+    )
+
+
+class Renderer:
+    # Dash-Komponenten als statisches HTML; Graphen bleiben leere Container,
+    # die static_years.js mit den Figuren füllt
+
+    def __init__(self, base, pages):
+        self.base = base
+        self.pages = set(pages)
+        # IDs, die auf der aktuellen Seite weggelassen werden
+        self.hidden = set()
+
+    def href(self, pathname):
+        if pathname is None:
+            return None
+        if pathname == '/':
+            return self.base
+        if pathname in self.pages:
+            return f'{self.base}{pathname.strip("/")}/'
+        return pathname
+
+    def render(self, component):
+        if component is None:
+            return ''
+        if isinstance(component, (list, tuple)):
+            return ''.join(self.render(child) for child in component)
+        if not hasattr(component, 'to_plotly_json'):
+            return html_escape.escape(str(component))
+        if getattr(component, 'id', None) in self.hidden:
+            return ''
+        method = getattr(self, f'render_{type(component).__name__.lower()}', self.render_element)
+        return method(component)
+
+    def render_element(self, component):
+        tag = type(component).__name__.lower()
+        style = getattr(component, 'style', None)
+        attrs = _attrs(
+            id=getattr(component, 'id', None),
+            **{'class': getattr(component, 'className', None)},
+            href=self.href(getattr(component, 'href', None)),
+            style=_style(style) if style else None,
+        )
+        children = self.render(getattr(component, 'children', None))
+        return f'<{tag}{attrs}/>' if tag in ('hr', 'br') else f'<{tag}{attrs}>{children}</{tag}>'
+
+    def render_accordion(self, component):
+        return f'<div class="accordion">{self.render(component.children)}</div>'
+
+    def render_accordionitem(self, component):
+        return f'<details><summary>{html_escape.escape(component.title)}</summary>{self.render(component.children)}</details>'
+
+    def render_alert(self, component):
+        color = getattr(component, 'color', None) or 'primary'
+        return f'<div class="alert alert-{color}">{self.render(component.children)}</div>'
+
+    def render_graph(self, component):
+        return f'<div class="graph"{_attrs(id=component.id)}></div>'
+
+    def render_store(self, component):
+        return ''
+
+    def render_progress(self, component):
+        return ''
+
+    def render_dropdown(self, component):
+        selected = _as_list(component.value)
+        options = ''.join(
+            f'<option{_attrs(value=option["value"], selected=option["value"] in selected)}>'
+            f'{html_escape.escape(str(option["label"]))}</option>'
+            for option in component.options
+        )
+        multi = getattr(component, 'multi', False)
+        return (f'<select class="form-select"{_attrs(id=component.id, multiple=multi, disabled=component.id != YEAR_INPUT)}'
+                f' style="width:50%">{options}</select>')
+
+    def render_radioitems(self, component):
+        return ''.join(
+            f'<label class="me-3"><input type="radio"'
+            f'{_attrs(name=component.id, value=option["value"], checked=option["value"] == component.value, disabled=True)}>'
+            f' {html_escape.escape(str(option["label"]))}</label>'
+            for option in component.options
+        )
+
+
+def page_figures(module, pathname, content):
+    # Figuren der Seite für die Voreinstellung und, bei Jahresauswahl, je Jahr.
+    # Die Eingaben der Callbacks kommen aus den Startwerten des Layouts.
+    components = list(_components(content))
+    graphs = {c.id: c for c in components if type(c).__name__ == 'Graph'}
+    values = {c.id: c.value for c in components if getattr(c, 'id', None) and hasattr(c, 'value')}
+    values['url'] = pathname
+    year_dropdown = next((c for c in components if getattr(c, 'id', None) == YEAR_INPUT), None)
+    years = [option['value'] for option in year_dropdown.options] if year_dropdown is not None else []
+
+    initial = {graph_id: graph.figure for graph_id, graph in graphs.items() if getattr(graph, 'figure', None)}
+    by_year = {year: {} for year in years}
+    recorder = CallbackRecorder()
+    if hasattr(module, 'register'):
+        module.register(recorder)
+    for outputs, inputs, func in recorder.callbacks:
+        if not all(output.component_id in graphs for output in outputs):
+            continue
+        input_ids = [item.component_id for item in inputs]
+        for year in (years if YEAR_INPUT in input_ids else [None]):
+            args = [year if input_id == YEAR_INPUT else values[input_id] for input_id in input_ids]
+            result = func(*args)
+            result = result if len(outputs) > 1 else [result]
+            figures = dict(zip([output.component_id for output in outputs], result))
+            if year is None:
+                initial.update(figures)
+            else:
+                by_year[year].update(figures)
+                if year == values.get(YEAR_INPUT):
+                    initial.update(figures)
+    # Clientseitig gebaute Graphen (Bar-Race) gibt es statisch nicht; sie und
+    # Eingaben, die nur sie steuern, fallen weg
+    server_inputs = {item.component_id for _, inputs, _ in recorder.callbacks for item in inputs}
+    hidden = {item.component_id for outputs, inputs in recorder.clientside for item in outputs}
+    hidden |= {item.component_id for outputs, inputs in recorder.clientside for item in inputs
+               if item.component_id not in server_inputs}
+    return initial, by_year, hidden
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def export(out, base='/'):
+    renderer = Renderer(base, routes.routes())
+    nav = renderer.render(sidebar.sidebar)
+    stylesheet = sidebar.app.config.external_stylesheets[0]
+
+    def page(title, content, figures, figures_url=''):
+        # </ im eingebetteten JSON maskieren, damit es das script-Tag nicht beendet
+        return PAGE.format(title=html_escape.escape(title), stylesheet=stylesheet, base=base, sidebar=nav,
+                           content=renderer.render(content), figures_url=figures_url,
+                           figures=to_json_plotly(figures).replace('</', '<\\/'))
+
+    os.makedirs(os.path.join(out, 'assets'), exist_ok=True)
+    shutil.copyfile(PLOTLY_JS, os.path.join(out, 'assets', 'plotly.min.js'))
+    shutil.copyfile(SHIM, os.path.join(out, 'assets', 'static_years.js'))
+    write(os.path.join(out, 'index.html'), page('Deutschlands Außenhandel', routes.start_page(), {}))
+
+    files = 1
+    for pathname in routes.routes():
+        module = importlib.import_module(routes.PAGES[pathname][0])
+        content = module.layout(pathname)
+        initial, by_year, renderer.hidden = page_figures(module, pathname, content)
+        directory = os.path.join(out, pathname.strip('/'))
+        title = next((c.children for c in _components(content) if type(c).__name__ == 'H1'), pathname)
+        figures_url = f'{base}{pathname.strip("/")}/{{jahr}}.json' if by_year else ''
+        write(os.path.join(directory, 'index.html'), page(title, content, initial, figures_url))
+        for year, figures in by_year.items():
+            write(os.path.join(directory, f'{year}.json'), to_json_plotly(figures))
+        files += 1 + len(by_year)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exportiert alle Seiten und Jahre als statische Dateien')
+    parser.add_argument('--out', default=os.path.join(ROOT, 'static_site'))
+    parser.add_argument('--base-url', default='/', help='Pfad, unter dem die Dateien ausgeliefert werden')
+    args = parser.parse_args()
+
+    base = args.base_url if args.base_url.endswith('/') else args.base_url + '/'
+    start = time.perf_counter()
+    files = export(args.out, base)
+    print(f'{files} Dateien in {time.perf_counter() - start:.2f} s geschrieben, Ausgabe in {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import numpy as np
+
+# Kennzahlen aus df_grouped, für die pro Jahr eine Sortierung vorgehalten wird
+METRICS = [
+    'export_wert', 'import_wert', 'handelsvolumen_wert', 'handelsbilanz',
+    'export_ranking', 'import_ranking', 'handelsvolumen_ranking',
+    'export_wachstum', 'import_wachstum', 'handelsvolumen_wachstum',
+    'export_wachstum_ranking', 'import_wachstum_ranking', 'handelsvolumen_wachstum_ranking',
+    'export_differenz', 'import_differenz', 'handelsvolumen_differenz',
+]
+
+
+class TopNIndex:
+    # Sortiert df_grouped einmal nach Jahr und hält je Kennzahl die
+    # Zeilenreihenfolge innerhalb jedes Jahres (aufsteigend, NaN und ±inf
+    # am Ende). Eine Top-N-Abfrage ist danach nur noch ein Slice.
+
+    def __init__(self, df, metrics=METRICS):
+        df = df.sort_values(['Jahr', 'Land'], kind='stable').reset_index(drop=True)
+        self.df = df
+        jahre = df['Jahr'].to_numpy()
+        self.years, self._starts = np.unique(jahre, return_index=True)
+
+        self._order = {}
+        self._valid = {}
+        for metric in metrics:
+            values = df[metric].to_numpy(dtype='float64')
+            # Unendliches Wachstum (Vorjahreswert 0) wie fehlende Werte behandeln
+            values = np.where(np.isfinite(values), values, np.nan)
+            # Nach Jahr und Wert sortieren; NaN landet bei argsort innerhalb des Jahres hinten
+            order = np.lexsort((values, jahre)).astype(np.int32)
+            self._order[metric] = order
+            self._valid[metric] = np.add.reduceat(~np.isnan(values[order]), self._starts)
+
+    def rows(self, year, metric, n, ascending=False):
+        pos = np.searchsorted(self.years, year)
+        if pos == len(self.years) or self.years[pos] != year:
+            return np.empty(0, dtype=np.int32)
+        start = self._starts[pos]
+        block = self._order[metric][start:start + self._valid[metric][pos]]
+        if ascending:
+            return block[:n]
+        return block[::-1][:n]
+
+    def query(self, year, metric, n, ascending=False, columns=None):
+        result = self.df.iloc[self.rows(year, metric, n, ascending)]
+        return result if columns is None else result[columns]
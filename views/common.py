@@ -0,0 +1,98 @@
+from dash import dcc
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+
+import country_cube
+import data_store
+import goods_search
+import rollups
+
+# Gemeinsame Bausteine der Seitenmodule
+
+# Kennzahlen, die auf den Länderseiten ausgewählt werden können
+KENNZAHLEN = {
+    'export_wert': 'Export',
+    'import_wert': 'Import',
+    'handelsvolumen_wert': 'Handelsvolumen',
+}
+DEFAULT_LAND = 'Vereinigte Staaten von Amerika'
+
+
+# Land × Jahr × Kennzahl-Würfel über df_grouped für die Länderanalyse
+def country_cube_index():
+    return data_store.get_derived('country_cube', 'df_grouped', country_cube.CountryCube)
+
+
+# Jahres- und Quartalssummen je WA-Code aus aggregated_df
+def time_rollup():
+    return data_store.get_derived('time_rollup', 'aggregated_df', rollups.TimeRollup)
+
+
+# Jahresauswahl aus den Jahren des aktuellen Snapshots, vorausgewählt das neueste
+def jahr_dropdown(jahre):
+    jahre = sorted(int(j) for j in jahre)
+    return dcc.Dropdown(
+        id='jahr_dropdown',
+        options=[{'label': str(j), 'value': j} for j in jahre],
+        value=jahre[-1],
+        clearable=False,
+        style={'width': '50%'}
+    )
+
+
+def land_dropdown(dropdown_id, value, multi=False):
+    return dcc.Dropdown(
+        id=dropdown_id,
+        options=[{'label': land, 'value': land} for land in country_cube_index().countries],
+        value=value,
+        multi=multi,
+        clearable=multi,
+        style={'width': '50%'}
+    )
+
+
+# Suchindex über Code/Label der Waren für die Warenauswahl
+def goods_index():
+    return data_store.get_derived('goods_search', 'aggregated_df', goods_search.GoodsIndex)
+
+
+def ware_options(search_value, value):
+    # Treffer aus dem Suchindex, höchstens goods_search.MAX_OPTIONS. 'search'
+    # enthält den Suchtext, damit das Dropdown unscharfe Treffer ("muell" ->
+    # Müll) nicht selbst wegfiltert. Die gewählte Ware bleibt als letzte
+    # Option dabei, sonst verwirft das Dropdown die Auswahl.
+    index = goods_index()
+    found = index.search(search_value)
+    options = [dict(index.option(i), search=search_value) if search_value else index.option(i) for i in found]
+    selected = index.code_index.get(value)
+    if selected is not None and selected not in found:
+        options = options[:goods_search.MAX_OPTIONS - 1] + [index.option(selected)]
+    return options
+
+
+# Warenauswahl mit Suche: im Layout nur die ersten Waren, weitere Optionen
+# liefert register_ware_search() je Suchtext vom Server
+def ware_dropdown(dropdown_id, value=None):
+    index = goods_index()
+    value = value if value in index.code_index else index.codes[0]
+    return dcc.Dropdown(
+        id=dropdown_id,
+        options=ware_options(None, value),
+        value=value,
+        clearable=False,
+        placeholder='Ware oder WA-Code suchen',
+        style={'width': '50%'}
+    )
+
+
+def register_ware_search(app, dropdown_id):
+    def update_ware_options(search_value, value):
+        if not search_value:
+            raise PreventUpdate
+        return ware_options(search_value, value)
+
+    app.callback(
+        Output(dropdown_id, 'options'),
+        Input(dropdown_id, 'search_value'),
+        State(dropdown_id, 'value')
+    )(update_ware_options)
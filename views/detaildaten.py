@@ -0,0 +1,90 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output
+import dash_bootstrap_components as dbc
+
+import background_jobs
+import data_access
+import figures
+import instrumentation
+from views.common import DEFAULT_LAND, land_dropdown, register_ware_search, ware_dropdown
+
+# Seiten über die Detaildaten Land × Ware (nur mit dem SQL-Backend):
+# "/land-top-waren" und "/ware-top-laender". Die Abfragen summieren über alle
+# Jahre in handel_detail, bei Millionen Zeilen dauert das Sekunden; sie
+# laufen deshalb als Hintergrund-Callbacks mit Fortschrittsanzeige.
+
+
+# Top-N aus den Detaildaten Land × Ware über alle Jahre; key ist Land bzw. WA-Code
+def detail_top_figures(set_progress, query, key, n, title):
+    measures = [('Ausfuhr: Wert', 'Export', figures.EXPORT_COLOR), ('Einfuhr: Wert', 'Import', figures.IMPORT_COLOR)]
+    try:
+        result = []
+        for i, (measure, name, color) in enumerate(measures):
+            background_jobs.report(set_progress, i, len(measures))
+            with instrumentation.phase('slicing'):
+                names, values = query(key, measure, n)
+            result.append(figures.figure(
+                [figures.bar_trace(names, values, name, color)],
+                title=title.format(n=n, name=name),
+                yaxis=figures.axis('Wert in € (2008 bis heute)')
+            ))
+        return tuple(result)
+    except data_access.DetailUnavailable:
+        return figures.empty_figure(), figures.empty_figure()
+
+
+# Deutschlands Top 10 Waren im Handel mit einem Land, als Hintergrund-Callback
+def update_land_top_waren(set_progress, land):
+    return detail_top_figures(set_progress, data_access.backend().country_top_goods, land, 10,
+                              f'Top {{n}} {{name}}waren Deutschlands im Handel mit {land}')
+
+
+# Deutschlands Top 5 Export- und Importländer einer Ware, als Hintergrund-Callback
+def update_ware_top_laender(set_progress, code):
+    return detail_top_figures(set_progress, data_access.backend().goods_top_countries, code, 5,
+                              f'Top {{n}} {{name}}länder Deutschlands für {code}')
+
+
+def layout(pathname):
+    if not data_access.backend().has_detail():
+        return html.Div([
+            html.H1("Detaildaten nicht verfügbar"),
+            dbc.Alert(
+                "Für diese Seite werden die Detaildaten Land × Ware benötigt. Sie werden mit "
+                "`python etl.py ROHEXPORT --sqlite data/handel.sqlite` erzeugt und mit DATA_BACKEND=sqlite genutzt.",
+                color="info"
+            )
+        ])
+    if pathname == "/land-top-waren":
+        return html.Div([
+            html.H1("Deutschlands Top 10 Waren im Handel"),
+            land_dropdown('land_waren_dropdown', DEFAULT_LAND),
+            background_jobs.progress_bar('land_waren_progress'),
+            dcc.Graph(id='land_waren_export_graph'),
+            dcc.Graph(id='land_waren_import_graph')
+        ])
+    return html.Div([
+        html.H1("Deutschlands Top 5 Export- und Importländer der Ware"),
+        ware_dropdown('ware_laender_dropdown'),
+        background_jobs.progress_bar('ware_laender_progress'),
+        dcc.Graph(id='ware_laender_export_graph'),
+        dcc.Graph(id='ware_laender_import_graph')
+    ])
+
+
+def register(app):
+    background_jobs.callback(
+        app,
+        [Output('land_waren_export_graph', 'figure'),
+         Output('land_waren_import_graph', 'figure')],
+        Input('land_waren_dropdown', 'value'),
+        'land_waren_progress'
+    )(update_land_top_waren)
+    background_jobs.callback(
+        app,
+        [Output('ware_laender_export_graph', 'figure'),
+         Output('ware_laender_import_graph', 'figure')],
+        Input('ware_laender_dropdown', 'value'),
+        'ware_laender_progress'
+    )(update_ware_top_laender)
+    register_ware_search(app, 'ware_laender_dropdown')
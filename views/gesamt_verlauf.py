@@ -0,0 +1,52 @@
+from dash import dcc, html
+import numpy as np
+
+import data_store
+import figures
+import instrumentation
+
+# Gesamter Export-, Import- und Handelsvolumen-Verlauf Deutschlands. Die
+# Figure hängt von keiner Auswahl ab und steckt deshalb direkt im
+# (je Datenversion gecachten) Layout, ohne eigenen Callback.
+
+
+def figure():
+    with instrumentation.phase('slicing'):
+        df_gesamt_deutschland = data_store.get_table('gesamt_deutschland')
+        jahre = df_gesamt_deutschland['Jahr'].to_numpy()
+
+    # Linien für Export, Import und Handelsvolumen
+    traces = [
+        figures.line_trace(jahre, df_gesamt_deutschland[col].to_numpy(), name, color, 'Jahr')
+        for col, name, color in zip(
+            ['gesamt_export', 'gesamt_import', 'gesamt_handelsvolumen'],
+            ['Exportvolumen', 'Importvolumen', 'Gesamthandelsvolumen'],
+            [figures.EXPORT_COLOR, figures.IMPORT_COLOR, figures.HANDELSVOLUMEN_COLOR]
+        )
+    ]
+
+    # Berechnung der maximalen Y-Achse für Tick-Werte
+    max_value = df_gesamt_deutschland[['gesamt_export', 'gesamt_import', 'gesamt_handelsvolumen']].values.max()
+    tick_step = 500e9  # 500 Mrd als Schrittgröße
+    tickvals = np.arange(0, max_value + tick_step, tick_step)
+
+    # Layout-Anpassungen
+    return figures.figure(
+        traces,
+        title='Entwicklung von Export, Import und Handelsvolumen',
+        xaxis=figures.axis('Jahr'),
+        yaxis=figures.axis(
+            'Wert in €',
+            tickformat=',',
+            tickvals=tickvals,
+            ticktext=[f"{val/1e9:.0f} Mrd" for val in tickvals]
+        ),
+        legend=figures.legend('Kategorie')
+    )
+
+
+def layout(pathname):
+    return html.Div([
+        html.H1("Gesamter Export-, Import- und Handelsvolumen-Verlauf Deutschlands"),
+        dcc.Graph(id='handel_graph', figure=figure())
+    ])
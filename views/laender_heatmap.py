@@ -0,0 +1,121 @@
+from dash import ctx, dcc, html, no_update
+from dash.dependencies import Input, Output, State
+import numpy as np
+
+import figures
+import heatmap
+import instrumentation
+from views.common import KENNZAHLEN
+
+# Heatmap Land × Monat über alle Handelspartner. Weit herausgezoomt schickt
+# der Server zu Blöcken gemittelte Werte, beim Hineinzoomen (relayoutData)
+# den Ausschnitt in voller Auflösung. Die Farbe folgt dem Logarithmus des
+# Werts, sonst wären neben China und den USA alle Länder gleich hell.
+
+# Höchstens so viele Beschriftungen je Achse
+MAX_TICKS = 40
+
+
+def _ticks(start, stop, step, labels):
+    # Blockmitten mit Beschriftung des ersten Eintrags im Block
+    blocks = list(range(start, min(stop, len(labels)), step))
+    every = -(-len(blocks) // MAX_TICKS)
+    shown = blocks[::every]
+    text = [labels[i] if step == 1 else f'{labels[i]} +{min(step, len(labels) - i) - 1}' for i in shown]
+    return [i + (step - 1) / 2 for i in shown], text
+
+
+def _month_ticks(start, stop, step, months):
+    # Bei vielen Monaten nur die Jahresanfänge beschriften
+    if (stop - start) // step <= MAX_TICKS:
+        return _ticks(start, stop, step, months)
+    shown = [i for i in range(start, min(stop, len(months))) if months[i].endswith('-01') and (i - start) % step == 0]
+    return [i + (step - 1) / 2 for i in shown], [months[i][:4] for i in shown]
+
+
+def heatmap_figure(kennzahl, rows=None, columns=None):
+    matrix = heatmap.matrix()
+    with instrumentation.phase('slicing'):
+        window = matrix.window(kennzahl, rows, columns)
+    (r0, r1, by), (c0, c1, bx) = window['rows'], window['columns']
+    z = window['z']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_z = np.where(z > 0, np.log10(z), np.nan)
+
+    aufloesung = 'Monat × Land' if by == 1 and bx == 1 else f'{bx} Monate × {by} Länder je Zelle, gemittelt'
+    geschaetzt = ' (geschätzt aus Jahreswerten und Monatsanteilen)' if matrix.estimated else ''
+    name = KENNZAHLEN[kennzahl]
+    y_vals, y_text = _ticks(r0, r1, by, matrix.countries)
+    x_vals, x_text = _month_ticks(c0, c1, bx, matrix.months)
+    exponents = np.arange(3, 13)
+
+    trace = {
+        'type': 'heatmap',
+        'z': heatmap.typed_array(log_z),
+        'customdata': heatmap.typed_array(z),
+        'x0': c0 + (bx - 1) / 2,
+        'dx': bx,
+        'y0': r0 + (by - 1) / 2,
+        'dy': by,
+        'zmin': 3,
+        'zmax': 12,
+        'colorscale': 'Viridis',
+        'colorbar': {'title': {'text': f'{name} in €'}, 'tickvals': exponents.tolist(),
+                     'ticktext': [figures.formatter(10.0 ** e) for e in exponents]},
+        'hovertemplate': f'{name}: %{{customdata:,.0f}} € im Monat<extra></extra>',
+        'hoverongaps': False,
+    }
+    layout_figure = figures.figure(
+        [trace],
+        title=f'{name} je Land und Monat: {aufloesung}{geschaetzt}',
+        xaxis=figures.axis('Monat', x_vals, x_text, range=[c0 - 0.5, min(c1, len(matrix.months)) - 0.5]),
+        # Größter Handelspartner oben
+        yaxis=figures.axis(None, y_vals, y_text, range=[min(r1, len(matrix.countries)) - 0.5, r0 - 0.5]),
+    )
+    layout_figure['layout'].update(height=800, margin={'l': 220})
+    return layout_figure
+
+
+def _range(relayout, axis, current):
+    # Neuer Bereich einer Achse aus relayoutData; None = ganze Achse
+    if relayout.get(f'{axis}.autorange'):
+        return None
+    if f'{axis}.range[0]' in relayout:
+        return [relayout[f'{axis}.range[0]'], relayout[f'{axis}.range[1]']]
+    if f'{axis}.range' in relayout:
+        return list(relayout[f'{axis}.range'])
+    return current
+
+
+def update_heatmap(kennzahl, relayout, fenster):
+    fenster = fenster or {'rows': None, 'columns': None}
+    if relayout is not None and 'heatmap_graph.relayoutData' in ctx.triggered_prop_ids:
+        neu = {'rows': _range(relayout, 'yaxis', fenster['rows']), 'columns': _range(relayout, 'xaxis', fenster['columns'])}
+        if neu == fenster:
+            # z. B. autosize oder Hover-Modus, kein neuer Ausschnitt
+            return no_update, no_update
+        fenster = neu
+    return heatmap_figure(kennzahl, fenster['rows'], fenster['columns']), fenster
+
+
+def layout(pathname):
+    return html.Div([
+        html.H1("Handel mit allen Ländern je Monat"),
+        dcc.RadioItems(
+            id='heatmap_kennzahl',
+            options=[{'label': label, 'value': value} for value, label in KENNZAHLEN.items()],
+            value='handelsvolumen_wert',
+            inline=True
+        ),
+        dcc.Store(id='heatmap_fenster'),
+        dcc.Graph(id='heatmap_graph', figure=heatmap_figure('handelsvolumen_wert'))
+    ])
+
+
+def register(app):
+    app.callback(
+        [Output('heatmap_graph', 'figure'), Output('heatmap_fenster', 'data')],
+        [Input('heatmap_kennzahl', 'value'), Input('heatmap_graph', 'relayoutData')],
+        State('heatmap_fenster', 'data'),
+        prevent_initial_call=True
+    )(update_heatmap)
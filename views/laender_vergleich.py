@@ -0,0 +1,44 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+import figures
+import instrumentation
+from views.common import DEFAULT_LAND, KENNZAHLEN, country_cube_index, land_dropdown
+
+
+# Vergleich mehrerer Länder in einer Kennzahl
+def update_laender_vergleich(laender, kennzahl):
+    cube = country_cube_index()
+    laender = [land for land in (laender or []) if land in cube.country_index]
+    with instrumentation.phase('slicing'):
+        werte = cube.compare(laender, kennzahl)
+
+    traces = [figures.line_trace(cube.years, werte[i], land, None, 'Jahr') for i, land in enumerate(laender)]
+    return figures.figure(
+        traces,
+        title=f'{KENNZAHLEN[kennzahl]} im Vergleich',
+        xaxis=figures.axis('Jahr'),
+        yaxis=figures.axis('Wert in €'),
+        legend=figures.legend('Land')
+    )
+
+
+def layout(pathname):
+    return html.Div([
+        html.H1("Vergleich mit anderen Ländern"),
+        land_dropdown('vergleich_dropdown', [DEFAULT_LAND, 'China', 'Frankreich'], multi=True),
+        dcc.RadioItems(
+            id='kennzahl_radio',
+            options=[{'label': name, 'value': col} for col, name in KENNZAHLEN.items()],
+            value='handelsvolumen_wert',
+            inline=True
+        ),
+        dcc.Graph(id='vergleich_graph')
+    ])
+
+
+def register(app):
+    app.callback(
+        Output('vergleich_graph', 'figure'),
+        [Input('vergleich_dropdown', 'value'), Input('kennzahl_radio', 'value')]
+    )(update_laender_vergleich)
@@ -0,0 +1,63 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+import data_access
+import data_store
+import figure_cache
+import figure_patch
+import figures
+import instrumentation
+import routes
+from views.common import jahr_dropdown
+
+# Länder mit den größten Export- und Importzuwächsen, absolut und relativ
+
+# Kennzahl und Y-Achse der Seiten zu den größten Zuwächsen
+GROWTH_PAGES = {
+    "/laender-zuwaechse-absolut": ('differenz', 'Veränderung zum Vorjahr in €', 'absolut'),
+    "/laender-zuwaechse-relativ": ('wachstum', 'Veränderung zum Vorjahr in %', 'relativ'),
+}
+
+
+@figure_patch.patch_on_year_change()
+@figure_cache.cached_figure(routes.route_version)
+def update_growth_graphs(pathname, year_selected):
+    if pathname not in GROWTH_PAGES:
+        return figures.empty_figure(), figures.empty_figure()
+    suffix, yaxis_title, art = GROWTH_PAGES[pathname]
+    backend = data_access.backend()
+
+    result = []
+    for prefix, name, color in [('export', 'Export', figures.EXPORT_COLOR), ('import', 'Import', figures.IMPORT_COLOR)]:
+        metric = f'{prefix}_{suffix}'
+        with instrumentation.phase('slicing'):
+            laender, werte = backend.top_countries(year_selected, metric, metric, 10)
+        result.append(figures.figure(
+            [figures.bar_trace(laender, werte, name, color)],
+            title=f"Top 10 Länder nach {name}zuwachs ({art}) im Jahr {year_selected}",
+            yaxis=figures.axis(yaxis_title)
+        ))
+    return tuple(result)
+
+
+YEAR_FIGURES = [update_growth_graphs]
+
+
+def layout(pathname):
+    # Für das erste Jahr gibt es keinen Vorjahreswert
+    jahre = sorted(data_store.get_table('df_grouped')['Jahr'].unique())[1:]
+    return html.Div([
+        html.H1(f"Länder mit größten Export- und Importzuwächsen ({GROWTH_PAGES[pathname][2]})"),
+        jahr_dropdown(jahre),
+        dcc.Graph(id='zuwachs_export_graph'),
+        dcc.Graph(id='zuwachs_import_graph')
+    ])
+
+
+def register(app):
+    # Beide Routen teilen sich die Graphen; url.pathname wählt die Kennzahl
+    app.callback(
+        [Output('zuwachs_export_graph', 'figure'),
+         Output('zuwachs_import_graph', 'figure')],
+        [Input('url', 'pathname'), Input('jahr_dropdown', 'value')]
+    )(update_growth_graphs)
@@ -0,0 +1,68 @@
+from dash import ClientsideFunction, dcc, html
+from dash.dependencies import Input, Output
+
+import data_store
+import figures
+import instrumentation
+import ranking_race
+from views.common import DEFAULT_LAND, country_cube_index, land_dropdown
+
+# Bar-Race der Top N aller Jahre: die Daten gehen einmal mit dem Layout an
+# den Browser, abgespielt wird ohne weitere Callbacks (assets/ranking_race.js)
+RACE_OPTIONS = [
+    {'label': 'Exportranking', 'value': 'export_ranking'},
+    {'label': 'Importranking', 'value': 'import_ranking'},
+]
+RACE_STYLE = {
+    'export_ranking': {'color': figures.EXPORT_COLOR, 'title': 'Top {n} im Exportranking Deutschlands', 'wert': 'Export'},
+    'import_ranking': {'color': figures.IMPORT_COLOR, 'title': 'Top {n} im Importranking Deutschlands', 'wert': 'Import'},
+}
+
+
+def race_payload():
+    race = data_store.get_derived('ranking_race', 'df_grouped', ranking_race.RankingRace)
+    return dict(race.payload(), style=RACE_STYLE)
+
+
+# Platzierung eines Landes im Export- und Importranking
+def update_land_ranking(land):
+    cube = country_cube_index()
+    if land not in cube.country_index:
+        return figures.empty_figure()
+    with instrumentation.phase('slicing'):
+        werte = cube.profile(land, ['export_ranking', 'import_ranking'])
+
+    traces = [
+        figures.line_trace(cube.years, werte[:, i], name, color, 'Jahr', value_format='Platz %{y}')
+        for i, (name, color) in enumerate([('Exportranking', figures.EXPORT_COLOR), ('Importranking', figures.IMPORT_COLOR)])
+    ]
+    return figures.figure(
+        traces,
+        title=f'Platzierung von {land} im Export- und Importranking Deutschlands',
+        xaxis=figures.axis('Jahr'),
+        yaxis=figures.axis('Platz', autorange='reversed'),  # Platz 1 oben
+        legend=figures.legend('Ranking')
+    )
+
+
+def layout(pathname):
+    return html.Div([
+        html.H1("Platzierung im Export- und Importranking Deutschlands"),
+        dcc.RadioItems(id='race_ranking', options=RACE_OPTIONS, value='export_ranking', inline=True),
+        dcc.Store(id='race_data', data=race_payload()),
+        dcc.Graph(id='race_graph', style={'height': '600px'}),
+        land_dropdown('ranking_land_dropdown', DEFAULT_LAND),
+        dcc.Graph(id='ranking_graph')
+    ])
+
+
+def register(app):
+    app.callback(
+        Output('ranking_graph', 'figure'),
+        Input('ranking_land_dropdown', 'value')
+    )(update_land_ranking)
+    app.clientside_callback(
+        ClientsideFunction(namespace='race', function_name='figure'),
+        Output('race_graph', 'figure'),
+        [Input('race_ranking', 'value'), Input('race_data', 'data')]
+    )
@@ -0,0 +1,45 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+import figures
+import instrumentation
+from views.common import DEFAULT_LAND, KENNZAHLEN, country_cube_index, land_dropdown
+
+
+# Export-, Import- und Handelsvolumen-Verlauf eines Landes
+def update_land_verlauf(land):
+    cube = country_cube_index()
+    if land not in cube.country_index:
+        return figures.empty_figure()
+    with instrumentation.phase('slicing'):
+        werte = cube.profile(land, list(KENNZAHLEN))
+
+    traces = [
+        figures.line_trace(cube.years, werte[:, i], f'{name}volumen', color, 'Jahr')
+        for i, (name, color) in enumerate(zip(
+            KENNZAHLEN.values(),
+            [figures.EXPORT_COLOR, figures.IMPORT_COLOR, figures.HANDELSVOLUMEN_COLOR]
+        ))
+    ]
+    return figures.figure(
+        traces,
+        title=f'Export, Import und Handelsvolumen zwischen Deutschland und {land}',
+        xaxis=figures.axis('Jahr'),
+        yaxis=figures.axis('Wert in €'),
+        legend=figures.legend('Kategorie')
+    )
+
+
+def layout(pathname):
+    return html.Div([
+        html.H1("Handelsverlauf mit Deutschland"),
+        land_dropdown('land_dropdown', DEFAULT_LAND),
+        dcc.Graph(id='land_verlauf_graph')
+    ])
+
+
+def register(app):
+    app.callback(
+        Output('land_verlauf_graph', 'figure'),
+        Input('land_dropdown', 'value')
+    )(update_land_verlauf)
@@ -0,0 +1,107 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output
+import functools
+import math
+import os
+
+import numpy as np
+
+import clientside_years
+import data_store
+import figure_cache
+import figure_patch
+import figures
+import instrumentation
+import routes
+from views.common import jahr_dropdown
+
+# Jahreswechsel auf dem monatlichen Handelsverlauf im Browser statt auf dem Server
+CLIENTSIDE_YEARS = os.environ.get('CLIENTSIDE_YEARS', '1') == '1'
+
+# Reihen, Titel und X-Achse des monatlichen Handelsverlaufs, gemeinsam für
+# den Server-Callback und die clientseitige Variante
+MONTHLY_SERIES = list(zip(
+    ['export_wert', 'import_wert', 'handelsvolumen_wert'],
+    ['Exportvolumen', 'Importvolumen', 'Gesamthandelsvolumen'],
+    [figures.EXPORT_COLOR, figures.IMPORT_COLOR, figures.HANDELSVOLUMEN_COLOR]
+))
+MONTHLY_TITLE = 'Monatlicher Export-, Import- und Handelsverlauf Deutschlands im Jahr {jahr}'
+MONTHLY_XAXIS = figures.axis(
+    'Monat',
+    tickmode='array',
+    tickvals=list(range(1, 13)),
+    ticktext=figures.MONTH_NAMES
+)
+
+
+@figure_patch.patch_on_year_change()
+@figure_cache.cached_figure(routes.route_version)
+def update_monthly_graph(pathname, year_selected):
+    with instrumentation.phase('slicing'):
+        df_gesamt_deutschland_monthly = data_store.get_table('gesamt_deutschland_monthly')
+        df_year_monthly = df_gesamt_deutschland_monthly[df_gesamt_deutschland_monthly['Jahr'] == year_selected]
+        monate = df_year_monthly['Monat'].to_numpy()
+
+    traces = [
+        figures.line_trace(monate, df_year_monthly[col].to_numpy(), name, color, 'Monat')
+        for col, name, color in MONTHLY_SERIES
+    ]
+
+    # Maximale Werte bestimmen
+    max_value = df_year_monthly[['export_wert', 'import_wert', 'handelsvolumen_wert']].values.max()
+
+    # Auf nächste 50 Mrd aufrunden
+    rounded_max = math.ceil(max_value / 50e9) * 50e9
+
+    # Y-Achse in 25-Mrd-Schritten skalieren
+    tickvals = np.arange(0, rounded_max + 1, 25e9)
+    ticktext = [figures.formatter(val) for val in tickvals]
+
+    # Layout für den Graphen
+    return figures.figure(
+        traces,
+        title=MONTHLY_TITLE.format(jahr=year_selected),
+        xaxis=MONTHLY_XAXIS,
+        yaxis=figures.axis('Wert in €', tickvals=tickvals, ticktext=ticktext),
+        legend=figures.legend('Kategorie')
+    )
+
+
+YEAR_FIGURES = [] if CLIENTSIDE_YEARS else [update_monthly_graph]
+
+
+# Store-Inhalt je Datenversion nur einmal aufbauen
+@functools.lru_cache(maxsize=2)
+def monthly_store_data(version):
+    return clientside_years.store_data(
+        data_store.get_table('gesamt_deutschland_monthly'),
+        x_column='Monat',
+        traces=[(col, figures.line_trace([], [], name, color, 'Monat')) for col, name, color in MONTHLY_SERIES],
+        title=MONTHLY_TITLE,
+        ticks={'round': 50e9, 'step': 25e9},  # auf 50 Mrd aufrunden, 25-Mrd-Schritte
+        xaxis=MONTHLY_XAXIS,
+        yaxis=figures.axis('Wert in €'),
+        legend=figures.legend('Kategorie')
+    )
+
+
+def layout(pathname):
+    children = [
+        html.H1("Monatlicher Handelsverlauf"),
+        jahr_dropdown(data_store.get_table('gesamt_deutschland_monthly')['Jahr'].unique()),
+    ]
+    if CLIENTSIDE_YEARS:
+        # Figure wird im Browser gebaut
+        children.append(clientside_years.store('monatlich_store', monthly_store_data(routes.route_version(pathname))))
+    children.append(dcc.Graph(id='monatlich_graph'))
+    return html.Div(children)
+
+
+def register(app):
+    if CLIENTSIDE_YEARS:
+        clientside_years.register(app, 'monatlich_graph', 'monatlich_store')
+    else:
+        app.callback(
+            Output('monatlich_graph', 'figure'),
+            [Input('url', 'pathname'), Input('jahr_dropdown', 'value')]
+        )(update_monthly_graph)
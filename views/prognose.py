@@ -0,0 +1,119 @@
+from dash import ctx, dcc, html, no_update
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+import bisect
+
+import figures
+import forecast
+import instrumentation
+from views.common import country_cube_index, time_rollup, ware_options
+
+# Export- und Importprognose für Deutschland gesamt, ein Land oder eine Ware.
+# Die Modelle passt forecast.py im Batch an; die Seite liest nur den Cache.
+
+SERIES = [('export', 'Export', figures.EXPORT_COLOR), ('import', 'Import', figures.IMPORT_COLOR)]
+
+
+def reihen_options(art):
+    if art == 'land':
+        return [{'label': land, 'value': land} for land in country_cube_index().countries]
+    if art == 'ware':
+        return ware_options(None, None)
+    return [{'label': forecast.KINDS['gesamt'], 'value': 'gesamt'}]
+
+
+def update_reihen(art, search_value, value):
+    if 'prognose_art.value' in ctx.triggered_prop_ids:
+        options = reihen_options(art)
+        return options, options[0]['value']
+    # Waren über den Suchindex, Länder filtert das Dropdown selbst
+    if art != 'ware' or not search_value:
+        raise PreventUpdate
+    return ware_options(search_value, value), no_update
+
+
+def _known(art, name):
+    # Beim Wechsel der Art kommt der alte Wert noch einmal mit der neuen Art,
+    # z. B. ('ware', 'gesamt'), bevor update_reihen den neuen setzt
+    if art == 'ware':
+        return name in time_rollup().code_index
+    if art == 'land':
+        return name in country_cube_index().country_index
+    return name == 'gesamt'
+
+
+def update_prognose(art, name):
+    if not _known(art, name):
+        return no_update
+    cache = forecast.load()
+    if cache is None:
+        return figures.figure([], title='Noch keine Prognose vorhanden: python forecast.py ausführen')
+    x_label = 'Jahr' if art == 'land' else 'Monat'
+
+    traces, veraltet = [], False
+    for measure, label, color in SERIES:
+        entry = cache['series'].get(forecast.series_key(art, name, measure))
+        if entry is None:
+            continue
+        with instrumentation.phase('slicing'):
+            freq, x, values = forecast.history(art, name, measure)
+        traces.append(figures.line_trace(x, values, label, color, x_label))
+        # Haben sich die Ist-Werte seit dem Lauf von forecast.py geändert (z. B.
+        # neue Monate nach einem Daten-Reload), schließt die Prognose an ihren
+        # letzten Eingabepunkt an statt an den letzten Ist-Wert und gilt als
+        # veraltet; die Linie läuft so nie rückwärts in der Zeit.
+        stale = forecast.series_hash(freq, values, len(entry['x'])) != entry['hash']
+        veraltet |= stale
+        anchor = bisect.bisect_left(x, entry['x'][0])
+        trace = figures.line_trace(list(x[anchor - 1:anchor]) + entry['x'],
+                                   list(values[anchor - 1:anchor]) + entry['forecast'],
+                                   f'{label} (Prognose{", veraltet" if stale else ""})', color, x_label)
+        trace['line']['dash'] = 'dot' if stale else 'dash'
+        traces.append(trace)
+
+    if art == 'ware':
+        rollup = time_rollup()
+        titel = f'{name} {rollup.labels[rollup.code_index[name]]}'
+    else:
+        titel = name if art == 'land' else 'Deutschland'
+    return figures.figure(
+        traces,
+        title=f'Export- und Importprognose: {titel} (Stand {cache["created"][:10]})'
+              + (' – veraltet, neue Ist-Werte: python forecast.py ausführen' if veraltet else ''),
+        xaxis=figures.axis(x_label),
+        yaxis=figures.axis('Wert in €'),
+        legend=figures.legend('Kategorie')
+    )
+
+
+def layout(pathname):
+    return html.Div([
+        html.H1("Export- und Importprognose"),
+        dcc.RadioItems(
+            id='prognose_art',
+            options=[{'label': label, 'value': art} for art, label in forecast.KINDS.items()],
+            value='gesamt',
+            inline=True
+        ),
+        dcc.Dropdown(
+            id='prognose_reihe',
+            options=reihen_options('gesamt'),
+            value='gesamt',
+            clearable=False,
+            style={'width': '50%'}
+        ),
+        dcc.Graph(id='prognose_graph')
+    ])
+
+
+def register(app):
+    app.callback(
+        [Output('prognose_reihe', 'options'), Output('prognose_reihe', 'value')],
+        [Input('prognose_art', 'value'), Input('prognose_reihe', 'search_value')],
+        State('prognose_reihe', 'value'),
+        prevent_initial_call=True
+    )(update_reihen)
+    app.callback(
+        Output('prognose_graph', 'figure'),
+        [Input('prognose_art', 'value'), Input('prognose_reihe', 'value')]
+    )(update_prognose)
@@ -0,0 +1,66 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+import data_access
+import data_store
+import figure_cache
+import figure_patch
+import figures
+import instrumentation
+import routes
+from views.common import jahr_dropdown
+
+
+@figure_patch.patch_on_year_change()
+@figure_cache.cached_figure(routes.route_version)
+def update_top_10_graphs(pathname, year_selected):
+    backend = data_access.backend()
+    with instrumentation.phase('slicing'):
+        top_10_export = backend.top_countries(year_selected, 'export_ranking', 'export_wert', 10, ascending=True)
+        top_10_import = backend.top_countries(year_selected, 'import_ranking', 'import_wert', 10, ascending=True)
+        top_10_trade_volume = backend.top_countries(year_selected, 'handelsvolumen_ranking', 'handelsvolumen_wert', 10, ascending=True)
+
+    # Export-Graph
+    fig_export = figures.figure(
+        [figures.bar_trace(*top_10_export, "Export", figures.EXPORT_COLOR)],
+        title="Top 10 Exportländer Deutschlands",
+        yaxis=figures.axis("Wert in €")
+    )
+
+    # Import-Graph
+    fig_import = figures.figure(
+        [figures.bar_trace(*top_10_import, "Import", figures.IMPORT_COLOR)],
+        title="Top 10 Importländer Deutschlands",
+        yaxis=figures.axis("Wert in €")
+    )
+
+    # Handelsvolumen-Graph
+    fig_trade = figures.figure(
+        [figures.bar_trace(*top_10_trade_volume, "Handelsvolumen", figures.HANDELSVOLUMEN_COLOR)],
+        title="Top 10 Handelspartner nach Handelsvolumen",
+        yaxis=figures.axis("Wert in €")
+    )
+
+    return fig_export, fig_import, fig_trade
+
+
+YEAR_FIGURES = [update_top_10_graphs]
+
+
+def layout(pathname):
+    return html.Div([
+        html.H1("Top 10 Handelsländer Deutschlands"),
+        jahr_dropdown(data_store.get_table('df_grouped')['Jahr'].unique()),
+        dcc.Graph(id='export_graph'),
+        dcc.Graph(id='import_graph'),
+        dcc.Graph(id='handelsvolumen_graph')
+    ])
+
+
+def register(app):
+    app.callback(
+        [Output('export_graph', 'figure'),
+         Output('import_graph', 'figure'),
+         Output('handelsvolumen_graph', 'figure')],
+        [Input('url', 'pathname'), Input('jahr_dropdown', 'value')]
+    )(update_top_10_graphs)
@@ -0,0 +1,47 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+import data_access
+import figure_cache
+import figure_patch
+import figures
+import instrumentation
+import routes
+from views.common import jahr_dropdown, time_rollup
+
+
+@figure_patch.patch_on_year_change()
+@figure_cache.cached_figure(routes.route_version)
+def update_top_10_waren(pathname, year_selected):
+    backend = data_access.backend()
+
+    result = []
+    for measure, name, color in [('Ausfuhr: Wert', 'Export', figures.EXPORT_COLOR), ('Einfuhr: Wert', 'Import', figures.IMPORT_COLOR)]:
+        with instrumentation.phase('slicing'):
+            labels, values = backend.top_goods(year_selected, measure, 10)
+        result.append(figures.figure(
+            [figures.bar_trace(labels, values, name, color)],
+            title=f"Top 10 {name}waren Deutschlands im Jahr {year_selected}",
+            yaxis=figures.axis("Wert in €")
+        ))
+    return tuple(result)
+
+
+YEAR_FIGURES = [update_top_10_waren]
+
+
+def layout(pathname):
+    return html.Div([
+        html.H1("Top 10 Waren im Handel Deutschlands"),
+        jahr_dropdown(time_rollup().years),
+        dcc.Graph(id='waren_export_graph'),
+        dcc.Graph(id='waren_import_graph')
+    ])
+
+
+def register(app):
+    app.callback(
+        [Output('waren_export_graph', 'figure'),
+         Output('waren_import_graph', 'figure')],
+        [Input('url', 'pathname'), Input('jahr_dropdown', 'value')]
+    )(update_top_10_waren)
@@ -0,0 +1,49 @@
+from dash import dcc, html
+from dash.dependencies import Input, Output
+
+import figures
+import instrumentation
+from views.common import register_ware_search, time_rollup, ware_dropdown
+
+
+# Export- und Importverlauf einer Ware
+def update_waren_verlauf(code, frequenz):
+    rollup = time_rollup()
+    if code not in rollup.code_index:
+        return figures.empty_figure()
+    x_label = 'Jahr' if frequenz == 'year' else 'Quartal'
+
+    traces = []
+    for measure, name, color in [('Ausfuhr: Wert', 'Export', figures.EXPORT_COLOR), ('Einfuhr: Wert', 'Import', figures.IMPORT_COLOR)]:
+        with instrumentation.phase('slicing'):
+            x, values = rollup.code_series(code, measure, frequenz)
+        traces.append(figures.line_trace(x, values, name, color, x_label))
+    return figures.figure(
+        traces,
+        title=f'Export- und Importverlauf: {rollup.labels[rollup.code_index[code]]}',
+        xaxis=figures.axis(x_label),
+        yaxis=figures.axis('Wert in €'),
+        legend=figures.legend('Kategorie')
+    )
+
+
+def layout(pathname):
+    return html.Div([
+        html.H1("Export- und Importverlauf der Ware"),
+        ware_dropdown('ware_dropdown'),
+        dcc.RadioItems(
+            id='frequenz_radio',
+            options=[{'label': 'Jährlich', 'value': 'year'}, {'label': 'Quartalsweise', 'value': 'quarter'}],
+            value='year',
+            inline=True
+        ),
+        dcc.Graph(id='waren_verlauf_graph')
+    ])
+
+
+def register(app):
+    app.callback(
+        Output('waren_verlauf_graph', 'figure'),
+        [Input('ware_dropdown', 'value'), Input('frequenz_radio', 'value')]
+    )(update_waren_verlauf)
+    register_ware_search(app, 'ware_dropdown')